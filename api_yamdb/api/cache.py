@@ -0,0 +1,132 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import transaction
+
+from api.versioning import row_etag
+
+TABLE_VERSION_KEY = 'table-version:{}'
+TABLE_MODIFIED_KEY = 'table-modified:{}'
+RESPONSE_STATS_KEYS = {
+    'hits': 'response-cache:hits',
+    'misses': 'response-cache:misses',
+}
+
+
+def scoped_table(model, **scope):
+    """Имя версии для части таблицы, например отзывов одного произведения."""
+    fields = ','.join(f'{name}={value}' for name, value in sorted(
+        scope.items()
+    ))
+    return f'{model._meta.db_table}:{fields}'
+
+
+def get_table_versions(tables):
+    """Текущие версии таблиц; недостающие заводятся заново.
+
+    Начальное значение берётся из часов, поэтому вытеснение счётчика из
+    кэша не возвращает старую версию и не оживляет устаревшие записи.
+    Вместо таблицы можно передать её часть из scoped_table().
+    """
+    keys = {TABLE_VERSION_KEY.format(table): table for table in tables}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, time.time_ns(), None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def get_tables_modified(tables):
+    """Время последней записи в таблицы; неизвестное считается текущим."""
+    keys = [TABLE_MODIFIED_KEY.format(table) for table in tables]
+    modified = cache.get_many(keys)
+    if len(modified) < len(keys):
+        return time.time()
+    return max(modified.values(), default=time.time())
+
+
+def _incr_table_version(table):
+    key = TABLE_VERSION_KEY.format(table)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+    cache.set(TABLE_MODIFIED_KEY.format(table), time.time(), None)
+
+
+def bump_table_version(table):
+    """Сдвигает версию таблицы после фиксации текущей транзакции.
+
+    До коммита читатели видят старые данные, и сдвиг версии раньше времени
+    позволил бы им закэшировать их под новой версией.
+    """
+    transaction.on_commit(lambda: _incr_table_version(table))
+
+
+def queryset_tables(queryset):
+    return sorted({
+        join.table_name for join in queryset.query.alias_map.values()
+    } | set(queryset.query.extra_tables) | {queryset.model._meta.db_table})
+
+
+def queryset_cache_key(prefix, queryset):
+    """Ключ кэша по SQL выборки и версиям всех задействованных таблиц."""
+    sql, params = queryset.query.sql_with_params()
+    versions = get_table_versions(queryset_tables(queryset))
+    digest = hashlib.md5(
+        repr((sql, params, sorted(versions.items()))).encode()
+    ).hexdigest()
+    return f'{prefix}:{queryset.model._meta.db_table}:{digest}'
+
+
+def conditional_metadata(request, tables, row=None):
+    """ETag и Last-Modified представления по версиям таблиц.
+
+    Для карточки row - пара (id, version) строки, и ETag строится из неё.
+    """
+    versions = get_table_versions(tables)
+    digest = hashlib.md5(repr((
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        sorted(versions.items()),
+    )).encode()).hexdigest()
+    etag = f'"{digest}"' if row is None else row_etag(*row, digest)
+    return etag, int(get_tables_modified(tables))
+
+
+def response_cache_key(request, tables):
+    """Ключ ответа по пути, нормализованной строке запроса и версиям."""
+    query = urlencode(sorted(
+        (name, value)
+        for name, values in request.GET.lists()
+        for value in values
+    ))
+    versions = get_table_versions(tables)
+    digest = hashlib.md5(repr((
+        request.path,
+        query,
+        request.META.get('HTTP_ACCEPT', ''),
+        sorted(versions.items()),
+    )).encode()).hexdigest()
+    return f'response:{digest}'
+
+
+def record_response_cache(hit):
+    key = RESPONSE_STATS_KEYS['hits' if hit else 'misses']
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_response_cache_stats():
+    values = cache.get_many(RESPONSE_STATS_KEYS.values())
+    stats = {
+        name: values.get(key, 0)
+        for name, key in RESPONSE_STATS_KEYS.items()
+    }
+    stats['backend'] = type(cache).__name__
+    return stats
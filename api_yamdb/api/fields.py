@@ -0,0 +1,39 @@
+from django.utils.encoding import smart_str
+from rest_framework import serializers
+
+
+class SlugListRelatedField(serializers.ManyRelatedField):
+    """Список слагов, который разрешается одним запросом к базе."""
+
+    def __init__(self, slug_field, queryset, **kwargs):
+        kwargs['child_relation'] = serializers.SlugRelatedField(
+            slug_field=slug_field, queryset=queryset
+        )
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        try:
+            found = {
+                smart_str(getattr(obj, child.slug_field)): obj
+                for obj in child.get_queryset().filter(
+                    **{f'{child.slug_field}__in': data}
+                )
+            }
+        except (TypeError, ValueError):
+            child.fail('invalid')
+        result = []
+        for item in data:
+            if smart_str(item) not in found:
+                child.fail(
+                    'does_not_exist',
+                    slug_name=child.slug_field,
+                    value=smart_str(item),
+                )
+            result.append(found[smart_str(item)])
+        return result
@@ -1,6 +1,8 @@
 from django_filters.rest_framework import CharFilter, FilterSet
+from rest_framework.filters import BaseFilterBackend
 
-from reviews.models import Title
+from reviews.models import Review, Title
+from reviews.search import search_titles
 
 
 class TitleFilter(FilterSet):
@@ -10,3 +12,23 @@ class TitleFilter(FilterSet):
     class Meta:
         model = Title
         fields = ['category', 'genre', 'name', 'year']
+
+
+class RecentReviewFilter(FilterSet):
+    genre = CharFilter(field_name='title__genre__slug')
+    category = CharFilter(field_name='title__category__slug')
+
+    class Meta:
+        model = Review
+        fields = ['category', 'genre']
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск по названию и описанию произведения."""
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        return search_titles(queryset, text)
@@ -0,0 +1,140 @@
+import hashlib
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from reviews.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+KEY_TOO_LONG_MESSAGE = 'Ключ идемпотентности длиннее 255 символов.'
+KEY_REUSED_MESSAGE = (
+    'Ключ идемпотентности уже использован для другого запроса.'
+)
+IN_PROGRESS_MESSAGE = 'Запрос с этим ключом ещё выполняется.'
+
+
+def expiry_cutoff():
+    return timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def lease_cutoff():
+    return timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_LEASE)
+
+
+def request_fingerprint(request):
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.get_full_path().encode())
+    digest.update(request.body)
+    return digest.hexdigest()
+
+
+def replay(record, fingerprint):
+    if record.fingerprint != fingerprint:
+        return Response(
+            {'detail': KEY_REUSED_MESSAGE},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if record.status_code is None:
+        return Response(
+            {'detail': IN_PROGRESS_MESSAGE}, status=status.HTTP_409_CONFLICT
+        )
+    response = Response(record.response_data, status=record.status_code)
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def take_over(record):
+    """Забирает ключ, который держит запрос без ответа дольше аренды.
+
+    Процесс, упавший посреди запроса, не успевает снять бронь, и без
+    аренды ключ отвечал бы 409 до истечения срока хранения. Условный
+    UPDATE по прежнему времени брони отдаёт ключ только одному повтору.
+    """
+    now = timezone.now()
+    taken = IdempotencyKey.objects.filter(
+        pk=record.pk, status_code__isnull=True, created=record.created
+    ).update(created=now)
+    record.created = now
+    return taken == 1
+
+
+def reserve(scope, key, fingerprint):
+    """Возвращает (запись, None) для нового ключа или (None, повтор)."""
+    record = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+    if record is not None:
+        if record.created < expiry_cutoff():
+            record.delete()
+        elif (
+            record.status_code is None
+            and record.fingerprint == fingerprint
+            and record.created < lease_cutoff()
+        ):
+            if take_over(record):
+                return record, None
+            record = IdempotencyKey.objects.filter(pk=record.pk).first()
+            if record is not None:
+                return None, replay(record, fingerprint)
+        else:
+            return None, replay(record, fingerprint)
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(
+                scope=scope, key=key, fingerprint=fingerprint
+            ), None
+    except IntegrityError:
+        # Параллельный запрос с тем же ключом успел первым.
+        record = IdempotencyKey.objects.get(scope=scope, key=key)
+        return None, replay(record, fingerprint)
+
+
+def idempotent(handler):
+    """Повтор POST с тем же Idempotency-Key получает сохранённый ответ.
+
+    Повтор стоит одного поиска по уникальному индексу (scope, key) и не
+    проходит ни валидацию, ни запись. Ответы с ошибкой сервера и
+    исключения не сохраняются, чтобы запрос можно было повторить.
+    Подходит и для функций-представлений, и для методов ViewSet.
+    """
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        request = next(arg for arg in args if isinstance(arg, Request))
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key or request.method != 'POST':
+            return handler(*args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            return Response(
+                {'detail': KEY_TOO_LONG_MESSAGE},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        scope = str(request.user.pk) if request.user.is_authenticated else ''
+        fingerprint = request_fingerprint(request)
+        record, response = reserve(scope, key, fingerprint)
+        if response is not None:
+            return response
+        try:
+            response = handler(*args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if response.status_code >= 500:
+            record.delete()
+            return response
+        IdempotencyKey.objects.filter(pk=record.pk).update(
+            status_code=response.status_code, response_data=response.data
+        )
+        return response
+    return wrapper
+
+
+def purge_expired():
+    """Удаляет просроченные ключи одним DELETE, без сигналов."""
+    expired = IdempotencyKey.objects.filter(created__lt=expiry_cutoff())
+    return expired._raw_delete(expired.db)
@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+
+from api.cache import bump_table_version, scoped_table
+from reviews.models import Comment, Review
+from users.models import User
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_state_lock = threading.Lock()
+_pending = 0
+_timer = None
+
+
+def journal_path():
+    return settings.COMMENT_JOURNAL
+
+
+def flushing_path():
+    return journal_path().with_suffix('.flushing')
+
+
+@contextmanager
+def locked(suffix):
+    """Межпроцессная блокировка на файле рядом с журналом."""
+    path = journal_path().with_suffix(suffix)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def enqueue(review_id, author_id, text):
+    """Записывает комментарий в журнал и возвращает его временный ключ.
+
+    Ответ клиенту уходит только после записи в журнал, поэтому падение
+    процесса до сброса в базу ничего не теряет: журнал дочитает следующий
+    flush() или команда flush_comments.
+    """
+    global _pending, _timer
+    key = uuid.uuid4().hex
+    line = json.dumps({
+        'key': key, 'review': review_id, 'author': author_id, 'text': text,
+    }, ensure_ascii=False) + '\n'
+    with locked('.lock'):
+        fd = os.open(journal_path(), os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(fd, line.encode())
+            if settings.COMMENT_JOURNAL_FSYNC:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    with _state_lock:
+        _pending += 1
+        full = _pending >= settings.COMMENT_BATCH_SIZE
+        if full:
+            _pending = 0
+        elif _timer is None:
+            _timer = threading.Timer(
+                settings.COMMENT_FLUSH_INTERVAL, flush_on_timer
+            )
+            _timer.daemon = True
+            _timer.start()
+    if full:
+        flush()
+    return key
+
+
+def flush_on_timer():
+    try:
+        flush()
+    finally:
+        connections.close_all()
+
+
+def flush():
+    """Переносит журнал в базу пачками, возвращает число новых комментариев.
+
+    Журнал переименовывается под блокировкой и дальше разбирается без неё,
+    так что новые комментарии продолжают писаться в свежий файл. Файл,
+    оставшийся от упавшего сброса, разбирается первым; уже вставленные
+    записи отсеиваются по ingest_key.
+    """
+    global _pending, _timer
+    with _state_lock:
+        if _timer is not None:
+            _timer.cancel()
+        _pending = 0
+        _timer = None
+    created = 0
+    with locked('.flush.lock'):
+        if flushing_path().exists():
+            created += load_journal(flushing_path())
+        with locked('.lock'):
+            if not journal_path().exists():
+                return created
+            os.replace(journal_path(), flushing_path())
+        created += load_journal(flushing_path())
+    return created
+
+
+def load_journal(path):
+    entries = []
+    with open(path, encoding='utf-8') as journal:
+        for line in journal:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # Недописанная строка: процесс упал до ответа клиенту.
+                continue
+    created = 0
+    for start in range(0, len(entries), settings.COMMENT_BATCH_SIZE):
+        created += insert_batch(
+            entries[start:start + settings.COMMENT_BATCH_SIZE]
+        )
+    path.unlink()
+    return created
+
+
+def insert_batch(entries):
+    """Вставляет пачку одним bulk_create и обновляет счётчики и кэш.
+
+    bulk_create не шлёт сигналы, поэтому comment_count и версии таблиц
+    сдвигаются здесь же, в той же транзакции.
+    """
+    with transaction.atomic():
+        seen = set(Comment.objects.filter(
+            ingest_key__in=[entry['key'] for entry in entries]
+        ).values_list('ingest_key', flat=True))
+        titles = dict(Review.objects.filter(
+            pk__in={entry['review'] for entry in entries}
+        ).values_list('pk', 'title_id'))
+        authors = set(User.objects.filter(
+            pk__in={entry['author'] for entry in entries}
+        ).values_list('pk', flat=True))
+        comments = Comment.objects.bulk_create([
+            Comment(
+                review_id=entry['review'],
+                author_id=entry['author'],
+                text=entry['text'],
+                ingest_key=entry['key'],
+            )
+            for entry in entries
+            if entry['key'] not in seen
+            and entry['review'] in titles
+            and entry['author'] in authors
+        ])
+        counts = Counter(comment.review_id for comment in comments)
+        for review_id, count in counts.items():
+            Review.objects.filter(pk=review_id).update(
+                comment_count=F('comment_count') + count
+            )
+            bump_table_version(scoped_table(
+                Review, id=review_id, title=titles[review_id]
+            ))
+            bump_table_version(scoped_table(Comment, review=review_id))
+        for title_id in {titles[review_id] for review_id in counts}:
+            bump_table_version(scoped_table(Review, title=title_id))
+        if comments:
+            bump_table_version(Comment._meta.db_table)
+            bump_table_version(Review._meta.db_table)
+    return len(comments)
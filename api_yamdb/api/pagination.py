@@ -0,0 +1,357 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from functools import reduce
+from operator import and_, or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import (EmptyPage, InvalidPage, Page,
+                                   PageNotAnInteger, Paginator)
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from api.cache import queryset_cache_key
+
+
+class CountlessPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CountlessPaginator(Paginator):
+    """Пагинатор без COUNT(*): следующая страница ищется по лишней записи."""
+
+    def validate_number(self, number):
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы должен быть целым числом')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('На этой странице нет результатов')
+        return CountlessPage(
+            rows[:self.per_page], number, self, len(rows) > self.per_page
+        )
+
+
+def archive_queryset(view):
+    """Архивное продолжение выборки, если представление его объявляет.
+
+    Архив должен содержать только записи, которые при сортировке выборки
+    идут после всех живых (например, более старые при сортировке от новых
+    к старым), тогда страницы просто продолжаются из архива.
+    """
+    get_archive_queryset = getattr(view, 'get_archive_queryset', None)
+    if get_archive_queryset is None:
+        return None
+    return get_archive_queryset()
+
+
+class ArchiveChain:
+    """Срезы живой выборки, продолжающиеся в архиве."""
+
+    def __init__(self, live, archive, live_count):
+        self.live = live
+        self.archive = archive
+        self.live_count = live_count
+
+    def __getitem__(self, item):
+        start, stop = item.start or 0, item.stop
+        rows = list(self.live[start:stop])
+        missing = stop - start - len(rows)
+        if missing > 0:
+            offset = max(start - self.live_count(), 0)
+            rows += self.archive[offset:offset + missing]
+        return rows
+
+
+class CountModePagination(PageNumberPagination):
+    """PageNumberPagination с выбором способа подсчёта ``count``.
+
+    ``?count=none`` отключает подсчёт, ``?count=estimate`` отдаёт оценку
+    планировщика (на PostgreSQL). По умолчанию ``count`` точный и берётся
+    из кэша, ключ которого зависит от версий всех таблиц выборки, так что
+    любая запись в них делает закэшированное значение недоступным.
+    """
+    count_query_param = 'count'
+    count_cache_timeout = settings.COUNT_CACHE_TIMEOUT
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        sources = [queryset]
+        rows = queryset
+        archive = archive_queryset(view)
+        if archive is not None:
+            sources.append(archive)
+            rows = ArchiveChain(
+                queryset, archive, lambda: self.cached_count(queryset)
+            )
+        mode = request.query_params.get(self.count_query_param)
+        if mode == 'none':
+            paginator = CountlessPaginator(rows, page_size)
+            self.count = None
+        elif mode == 'estimate':
+            paginator = CountlessPaginator(rows, page_size)
+            self.count = sum(map(self.estimate_count, sources))
+        else:
+            paginator = self.django_paginator_class(rows, page_size)
+            paginator.count = self.count = sum(
+                map(self.cached_count, sources)
+            )
+
+        page_number = request.query_params.get(self.page_query_param, 1)
+        try:
+            if page_number in self.last_page_strings:
+                if isinstance(paginator, CountlessPaginator):
+                    raise EmptyPage('Последняя страница неизвестна')
+                page_number = paginator.num_pages
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def cached_count(self, queryset):
+        if queryset.query.is_empty():
+            return 0
+        key = queryset_cache_key('count', queryset)
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, self.count_cache_timeout)
+        return count
+
+    def estimate_count(self, queryset):
+        """Оценка числа строк из плана PostgreSQL.
+
+        QuerySet.explain() отдаёт JSON-план строкой repr() уже разобранного
+        списка, поэтому EXPLAIN выполняется напрямую.
+        """
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return self.cached_count(queryset)
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        return plan[0]['Plan']['Plan Rows']
+
+
+class KeysetPagination(BasePagination):
+    """Пагинация по ключу сортировки без COUNT(*) и OFFSET.
+
+    Позиция в выборке кодируется в непрозрачный курсор из значений полей
+    сортировки последней (или первой) записи страницы. Порядок берётся из
+    queryset или Meta.ordering модели и при необходимости дополняется pk,
+    чтобы ключ был уникальным. NULL считается наименьшим значением.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+    unsupported_ordering_message = (
+        'Курсорная пагинация недоступна для этой сортировки.'
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.model = queryset.model
+        self.ordering = self.get_ordering(queryset)
+        position, self.reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        sources = [queryset]
+        archive = archive_queryset(view)
+        if archive is not None:
+            sources.append(archive)
+        if self.reverse:
+            ordering = [(name, not desc) for name, desc in ordering]
+            sources.reverse()
+
+        results = []
+        for source in sources:
+            source = source.order_by(*(
+                self.order_expression(name, desc) for name, desc in ordering
+            ))
+            if position is not None:
+                source = source.filter(self.after(ordering, position))
+            results += source[:self.page_size + 1 - len(results)]
+            if len(results) > self.page_size:
+                break
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_ordering(self, queryset):
+        ordering = []
+        for item in (queryset.query.order_by
+                     or queryset.model._meta.ordering):
+            name = item.lstrip('-')
+            if name == 'pk':
+                name = queryset.model._meta.pk.name
+            try:
+                self.get_field(name)
+            except FieldDoesNotExist:
+                raise ParseError(self.unsupported_ordering_message)
+            ordering.append((name, item.startswith('-')))
+        last = ordering[-1][0] if ordering else None
+        if last is None or not self.get_field(last).unique:
+            ordering.append((queryset.model._meta.pk.name, False))
+        return ordering
+
+    def get_field(self, name):
+        return self.model._meta.get_field(name)
+
+    def order_expression(self, name, desc):
+        if not self.get_field(name).null:
+            return f'-{name}' if desc else name
+        if desc:
+            return F(name).desc(nulls_last=True)
+        return F(name).asc(nulls_first=True)
+
+    def beyond(self, name, desc, value):
+        """Условие «строго дальше value» по одному полю, либо None."""
+        if desc:
+            if value is None:
+                return None
+            condition = Q(**{f'{name}__lt': value})
+            if self.get_field(name).null:
+                condition |= Q(**{f'{name}__isnull': True})
+            return condition
+        if value is None:
+            return Q(**{f'{name}__isnull': False})
+        return Q(**{f'{name}__gt': value})
+
+    def not_before(self, name, desc, value):
+        """Нестрогая граница по первому полю для поиска по индексу."""
+        if value is None:
+            return Q(**{f'{name}__isnull': True}) if desc else Q()
+        condition = Q(**{f'{name}__{"lte" if desc else "gte"}': value})
+        if desc and self.get_field(name).null:
+            condition |= Q(**{f'{name}__isnull': True})
+        return condition
+
+    def after(self, ordering, position):
+        conditions = []
+        equal = []
+        for (name, desc), value in zip(ordering, position):
+            condition = self.beyond(name, desc, value)
+            if condition is not None:
+                conditions.append(reduce(and_, equal + [condition]))
+            if value is None:
+                equal.append(Q(**{f'{name}__isnull': True}))
+            else:
+                equal.append(Q(**{name: value}))
+        if not conditions:
+            return Q(pk__in=[])
+        (name, desc), value = ordering[0], position[0]
+        return self.not_before(name, desc, value) & reduce(or_, conditions)
+
+    def encode_cursor(self, obj, reverse):
+        position = [
+            self.get_field(name).value_to_string(obj)
+            if getattr(obj, name) is not None else None
+            for name, _ in self.ordering
+        ]
+        payload = json.dumps({'p': position, 'r': int(reverse)})
+        encoded = urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(
+                encoded + '=' * (-len(encoded) % 4)
+            ))
+            position = payload['p']
+            if len(position) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.get_field(name).to_python(value)
+                if value is not None else None
+                for (name, _), value in zip(self.ordering, position)
+            ]
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, FieldDoesNotExist,
+                ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class PageNumberOrKeysetPagination(CountModePagination):
+    """Постраничная пагинация с переходом на курсоры по запросу клиента.
+
+    По умолчанию ответ совпадает с CountModePagination. Если в запросе
+    есть параметр ``cursor`` (для первой страницы — пустой), используется
+    KeysetPagination.
+    """
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
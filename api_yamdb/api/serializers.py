@@ -1,13 +1,53 @@
 from django.conf import settings
-from django.shortcuts import get_object_or_404
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.fields import CharField, EmailField
+from rest_framework.utils import model_meta
 
+from api.fields import SlugListRelatedField
+from api.versioning import VersionConflict
 from api.validators import username_validator
 from reviews.models import Category, Genre, Title, Review, Comment
+from reviews.scores import score_summary
 from users.models import User
 
 
+class ChangedFieldsUpdateMixin:
+    """Обновление пишет только изменившиеся поля.
+
+    Вместо полного save() выполняется один UPDATE ... WHERE version = ?
+    по полям, значения которых действительно поменялись, поэтому запрос
+    не затирает ни чужую правку, ни счётчики, которые ведут сигналы.
+    Если не поменялось ничего, запроса к базе нет вовсе, а ожидаемая
+    версия из If-Match сверяется с прочитанной строкой.
+    """
+
+    def update(self, instance, validated_data):
+        info = model_meta.get_field_info(instance)
+        changed, many_to_many = [], {}
+        for attr, value in validated_data.items():
+            if attr in info.relations and info.relations[attr].to_many:
+                many_to_many[attr] = value
+                continue
+            field = instance._meta.get_field(attr)
+            new = value
+            if field.is_relation and value is not None:
+                new = value.pk
+            if getattr(instance, field.attname) != new:
+                setattr(instance, attr, value)
+                changed.append(attr)
+        with transaction.atomic():
+            if changed or many_to_many:
+                instance.save(update_fields=changed)
+            elif instance.__dict__.pop('_expected_version', None) not in (
+                None, instance.version
+            ):
+                raise VersionConflict
+            for attr, value in many_to_many.items():
+                getattr(instance, attr).set(value)
+        return instance
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
@@ -24,19 +64,38 @@ class TitleSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
     rating = serializers.IntegerField(read_only=True)
+    scores = serializers.SerializerMethodField()
 
     class Meta:
         model = Title
         fields = ('id', 'name', 'year', 'description',
-                  'category', 'genre', 'rating')
+                  'category', 'genre', 'rating', 'scores')
+
+    def get_fields(self):
+        """Гистограмма оценок есть в карточке, а в списке - по запросу."""
+        fields = super().get_fields()
+        if not self.context.get('include_scores', True):
+            del fields['scores']
+        return fields
+
+    def get_scores(self, obj):
+        return score_summary(obj.score_counts)
 
 
-class TitleCreateSerializer(serializers.ModelSerializer):
+class TopTitleSerializer(TitleSerializer):
+    bayesian_rating = serializers.FloatField(read_only=True)
+
+    class Meta(TitleSerializer.Meta):
+        fields = TitleSerializer.Meta.fields + ('bayesian_rating',)
+
+
+class TitleCreateSerializer(ChangedFieldsUpdateMixin,
+                            serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
         slug_field='slug', queryset=Category.objects.all()
     )
-    genre = serializers.SlugRelatedField(
-        slug_field='slug', queryset=Genre.objects.all(), many=True
+    genre = SlugListRelatedField(
+        slug_field='slug', queryset=Genre.objects.all()
     )
 
     class Meta:
@@ -44,7 +103,7 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         fields = ('name', 'year', 'description', 'category', 'genre', 'id')
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ChangedFieldsUpdateMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = (
@@ -98,25 +157,14 @@ class TokenSerializer(serializers.Serializer):
     )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(ChangedFieldsUpdateMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username', read_only=True)
 
     class Meta:
         model = Review
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
-
-    def validate(self, data):
-        if self.context['request'].method == 'POST':
-            title_id = self.context['view'].kwargs.get('title_id')
-            title = get_object_or_404(Title, id=title_id)
-            author = self.context['request'].user
-
-            if Review.objects.filter(title=title, author=author).exists():
-                raise serializers.ValidationError(
-                    'Вы уже оставили отзыв для этого произведения'
-                )
-        return data
+        fields = ('id', 'text', 'author', 'score', 'pub_date',
+                  'comment_count')
 
     def validate_score(self, score):
         if not settings.MIN_SCORE_REVIEW <= score <= settings.MAX_SCORE_REVIEW:
@@ -127,10 +175,27 @@ class ReviewSerializer(serializers.ModelSerializer):
         return score
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class RecentReviewSerializer(ReviewSerializer):
+    title = serializers.PrimaryKeyRelatedField(read_only=True)
+    title_name = serializers.CharField(source='title.name', read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title', 'title_name')
+
+
+class CommentSerializer(ChangedFieldsUpdateMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username')
 
     class Meta:
         fields = ('id', 'text', 'author', 'pub_date')
         model = Comment
+
+
+class CommentHistorySerializer(CommentSerializer):
+    review = serializers.PrimaryKeyRelatedField(read_only=True)
+    title = serializers.IntegerField(source='review.title_id', read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ('review', 'title')
@@ -0,0 +1,53 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save)
+from django.dispatch import receiver
+
+from api.cache import bump_table_version, scoped_table
+from reviews.models import ArchivedComment, Comment, Review, Title
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def model_changed(sender, instance, **kwargs):
+    bump_table_version(sender._meta.db_table)
+    if sender is Title:
+        bump_table_version(scoped_table(Title, id=instance.pk))
+    elif sender is Review:
+        bump_table_version(scoped_table(
+            Review, id=instance.pk, title=instance.title_id
+        ))
+        bump_table_version(scoped_table(Review, title=instance.title_id))
+        bump_table_version(scoped_table(Title, id=instance.title_id))
+    elif sender in (Comment, ArchivedComment):
+        bump_table_version(scoped_table(Comment, id=instance.pk))
+        bump_table_version(scoped_table(Comment, review=instance.review_id))
+        if kwargs.get('created', True):
+            comment_count_changed(instance)
+
+
+def comment_count_changed(comment):
+    """Счётчик комментариев виден в отзыве и в списке отзывов."""
+    if type(comment).review.is_cached(comment):
+        title_id = comment.review.title_id
+    else:
+        title_id = Review.objects.filter(pk=comment.review_id).values_list(
+            'title_id', flat=True
+        ).first()
+    if title_id is not None:
+        bump_table_version(scoped_table(
+            Review, id=comment.review_id, title=title_id
+        ))
+        bump_table_version(scoped_table(Review, title=title_id))
+
+
+@receiver(m2m_changed)
+def relation_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_table_version(sender._meta.db_table)
+
+
+@receiver(post_migrate)
+def tables_migrated(sender, **kwargs):
+    """После migrate/flush данные могли измениться без сигналов моделей."""
+    for model in sender.get_models(include_auto_created=True):
+        bump_table_version(model._meta.db_table)
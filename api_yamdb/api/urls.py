@@ -1,14 +1,17 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       get_token, ReviewViewSet, signup, TitleViewSet,
-                       UserViewSet)
+from api.views import (cache_stats, CategoryViewSet, CommentViewSet,
+                       GenreViewSet, get_token, RecentReviewViewSet,
+                       ReviewViewSet, signup, TitleViewSet, UserViewSet)
 
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet, basename='categories')
 router.register(r'genres', GenreViewSet, basename='genres')
 router.register(r'titles', TitleViewSet, basename='titles')
+router.register(
+    r'reviews/recent', RecentReviewViewSet, basename='recent_reviews'
+)
 router.register(
     r'titles/(?P<title_id>[\d]+)/reviews',
     ReviewViewSet,
@@ -24,5 +27,6 @@ router.register(r'users', UserViewSet, basename='users')
 urlpatterns = [
     path('v1/auth/signup/', signup, name='signup'),
     path('v1/auth/token/', get_token, name='get_token'),
+    path('v1/cache/stats/', cache_stats, name='cache_stats'),
     path('v1/', include(router.urls)),
 ]
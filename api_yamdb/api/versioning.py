@@ -0,0 +1,80 @@
+import re
+
+from django.db import models
+from django.utils.http import parse_etags
+
+ROW_ETAG = re.compile(r'^(?:W/)?"(?P<pk>\d+)-(?P<version>\d+)-[^"]*"$')
+
+
+class VersionConflict(Exception):
+    """Строку успели изменить после того, как она была прочитана."""
+
+
+class VersionedModel(models.Model):
+    """Оптимистическая блокировка по столбцу version.
+
+    Любое сохранение уже существующей строки превращается в
+    UPDATE ... WHERE id = ? AND version = ? и увеличивает version. Если
+    строку за это время изменил кто-то другой, UPDATE не затрагивает ни
+    одной строки и поднимается VersionConflict. Ожидаемую версию можно
+    задать заранее в _expected_version, например взяв её из If-Match.
+    """
+    version = models.PositiveIntegerField(
+        'Версия', default=0, editable=False
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        current = self.version
+        if getattr(self, '_expected_version', None) is None:
+            self._expected_version = current
+        self.version = self._expected_version + 1
+        try:
+            return super().save(*args, **kwargs)
+        except VersionConflict:
+            self.version = current
+            raise
+        finally:
+            del self._expected_version
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields,
+                   forced_update):
+        expected = getattr(self, '_expected_version', None)
+        if expected is None:
+            return super()._do_update(
+                base_qs, using, pk_val, values, update_fields, forced_update
+            )
+        if not super()._do_update(
+            base_qs.filter(version=expected), using, pk_val, values,
+            update_fields, forced_update,
+        ):
+            raise VersionConflict
+        return True
+
+
+def row_etag(pk, version, digest):
+    """ETag карточки: id и версия строки плюс хэш остального представления.
+
+    Хэш меняется вместе со связанными таблицами и нужен только для 304,
+    а If-Match сверяется по версии строки.
+    """
+    return f'"{pk}-{version}-{digest}"'
+
+
+def parse_if_match(header, pk):
+    """Версии строки pk из заголовка If-Match; None, если там '*'."""
+    etags = parse_etags(header)
+    if etags == ['*']:
+        return None
+    versions = []
+    for etag in etags:
+        match = ROW_ETAG.match(etag)
+        if match and int(match['pk']) == pk:
+            versions.append(int(match['version']))
+    return versions
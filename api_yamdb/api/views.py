@@ -2,44 +2,310 @@ import uuid
 
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, status, viewsets
-from rest_framework.decorators import action, api_view
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import APIException, ValidationError
 from rest_framework.generics import get_object_or_404
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken
 
-from api.filter import TitleFilter
-from api.permissions import (IsAdmin, IsAdminOrReadOnly,
+from api.cache import (conditional_metadata, get_response_cache_stats,
+                       record_response_cache, response_cache_key,
+                       scoped_table)
+from api.filter import RecentReviewFilter, TitleFilter, TitleSearchFilter
+from api.idempotency import idempotent
+from api.ingest import enqueue
+from api.pagination import (CountModePagination, KeysetPagination,
+                            PageNumberOrKeysetPagination)
+from api.permissions import (IsAdmin, IsAdminOrModerator, IsAdminOrReadOnly,
                              IsUserAdminModeratorOrReadOnly)
 from api.serializers import (CategorySerializer, TokenSerializer,
                              UserEditSerializer, UserSerializer,
                              GenreSerializer, TitleSerializer,
-                             TitleCreateSerializer, SignupSerializer,
-                             ReviewSerializer, CommentSerializer)
-from reviews.models import Category, Genre, Title, Review
+                             TitleCreateSerializer, TopTitleSerializer,
+                             SignupSerializer,
+                             ReviewSerializer, RecentReviewSerializer,
+                             CommentSerializer, CommentHistorySerializer)
+from api.versioning import VersionConflict, VersionedModel, parse_if_match
+from reviews.leaderboards import (OVERALL, category_scope, genre_scope,
+                                  top_titles)
+from reviews.models import (ArchivedComment, Category, Comment, Genre,
+                            Review, Title)
+from reviews.search import FTS_TABLE
 from users.models import User
 
 
+class PrecomputedResponse(Exception):
+    """Ответ, готовый раньше обработчика: 304 или ответ из кэша."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class PrecomputedResponseMixin:
+
+    def handle_exception(self, exc):
+        if isinstance(exc, PrecomputedResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+
+class CachedResponseMixin(PrecomputedResponseMixin):
+    """Кэш ответов на анонимные GET-запросы.
+
+    В ключ входят версии таблиц из cache_models, поэтому любая запись в них
+    делает старые ответы недостижимыми, и они просто истекают по таймауту.
+    Кэш проверяется после аутентификации и проверки прав.
+    """
+    cache_models = ()
+    cache_timeout = settings.RESPONSE_CACHE_TIMEOUT
+    cache_key = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method != 'GET' or 'HTTP_AUTHORIZATION' in request.META:
+            return
+        self.cache_key = response_cache_key(request, self.get_cache_tables())
+        cached = cache.get(self.cache_key)
+        record_response_cache(hit=cached is not None)
+        if cached is not None:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+            response['X-Cache'] = 'HIT'
+            raise PrecomputedResponse(response)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        key = self.cache_key
+        if key is not None and isinstance(response, Response) and (
+            response.status_code == status.HTTP_200_OK
+        ):
+            response['X-Cache'] = 'MISS'
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key,
+                    (rendered.content, rendered['Content-Type']),
+                    self.cache_timeout,
+                )
+            )
+        return response
+
+    def get_cache_tables(self):
+        return [model._meta.db_table for model in self.cache_models]
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = (
+        'Объект изменился после того, как был прочитан. '
+        'Получите его заново и повторите изменение.'
+    )
+    default_code = 'precondition_failed'
+
+
+CONDITIONAL_HEADERS = (
+    'HTTP_IF_MATCH',
+    'HTTP_IF_NONE_MATCH',
+    'HTTP_IF_MODIFIED_SINCE',
+    'HTTP_IF_UNMODIFIED_SINCE',
+)
+
+
+class ConditionalGetMixin(PrecomputedResponseMixin):
+    """ETag и Last-Modified для GET-запросов по версиям таблиц.
+
+    Проверка If-None-Match/If-Modified-Since выполняется после проверки
+    прав и существования объекта, но до выборки: ответ 304 стоит только
+    запросов по первичному ключу, а несуществующий маршрут получает 404.
+    ETag карточки содержит id и version строки. If-Match в PATCH
+    разбирается в ожидаемую версию, и проверкой служит сам условный
+    UPDATE ... WHERE version = ?: устаревшая версия получает 412.
+    """
+    version_tables = None
+    version_row = None
+    expected_version = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in ('GET', 'PATCH'):
+            return
+        self.version_tables = self.get_version_tables()
+        if self.version_tables is None or not any(
+            header in request.META for header in CONDITIONAL_HEADERS
+        ) or not self.load_version_row():
+            return
+        if request.method == 'PATCH':
+            self.read_if_match(request)
+            return
+        etag, last_modified = conditional_metadata(
+            request, self.version_tables, self.version_row
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            raise PrecomputedResponse(response)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if self.version_tables is not None and response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            etag, last_modified = conditional_metadata(
+                request, self.version_tables, self.version_row
+            )
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def load_version_row(self):
+        """Читает (id, version) карточки; False, если объекта нет.
+
+        get_version_queryset() возвращает выборку объекта карточки или
+        None, если проверять нечего. На отсутствующий объект обработчик
+        сам ответит 404.
+        """
+        try:
+            queryset = self.get_version_queryset()
+            if queryset is None:
+                return True
+            self.version_row = queryset.values_list('pk', 'version').first()
+        except (TypeError, ValueError, DjangoValidationError):
+            return False
+        return self.version_row is not None
+
+    def read_if_match(self, request):
+        header = request.META.get('HTTP_IF_MATCH')
+        if header is None or self.version_row is None:
+            return
+        versions = parse_if_match(header, self.version_row[0])
+        if versions is None:
+            return
+        if len(versions) != 1:
+            raise PreconditionFailed
+        self.expected_version = versions[0]
+
+    def get_object(self):
+        obj = super().get_object()
+        if isinstance(obj, VersionedModel):
+            self.version_row = (obj.pk, obj.version)
+        return obj
+
+    def perform_update(self, serializer):
+        if self.expected_version is not None:
+            serializer.instance._expected_version = self.expected_version
+        super().perform_update(serializer)
+        self.version_row = (
+            serializer.instance.pk, serializer.instance.version
+        )
+
+    def is_detail_request(self):
+        return (self.lookup_url_kwarg or self.lookup_field) in self.kwargs
+
+    def get_version_tables(self):
+        raise NotImplementedError
+
+
 class BanPutHeadOptionsMethodsMixinViewSet(viewsets.ModelViewSet):
     http_method_names = ('get', 'patch', 'post', 'delete')
 
+    def perform_update(self, serializer):
+        """Изменение пишется условным UPDATE по версии строки.
 
-class BaseReviewViewSet(BanPutHeadOptionsMethodsMixinViewSet):
-    permission_classes = (IsUserAdminModeratorOrReadOnly,)
+        Если между чтением объекта и записью его изменил другой запрос,
+        UPDATE не находит строку, и клиент получает 412.
+        """
+        try:
+            serializer.save()
+        except VersionConflict:
+            raise PreconditionFailed
 
-    def get_instance(self, model, pk):
-        return get_object_or_404(model, pk=pk)
 
+class BaseReviewViewSet(BanPutHeadOptionsMethodsMixinViewSet):
+    permission_classes = (IsUserAdminModeratorOrReadOnly,)
+    pagination_class = PageNumberOrKeysetPagination
+
+    parent_model = None
+    parent_lookups = {}
+    related_name = None
+    only_fields = ()
+
+    def get_parent(self):
+        """Родительский объект вложенного маршрута.
+
+        Все идентификаторы из URL проверяются одним запросом по первичному
+        ключу, а результат запоминается до конца запроса: его используют
+        список, создание и поиск объекта.
+        """
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(self.parent_model, **{
+                field: self.kwargs[kwarg]
+                for field, kwarg in self.parent_lookups.items()
+            })
+        return self._parent
 
-class CategoryGenreMixinViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        return getattr(self.get_parent(), self.related_name).select_related(
+            'author'
+        ).only(*self.only_fields, 'author', 'author__username')
+
+    def get_known_users(self):
+        """Карта пользователей запроса: id -> уже загруженный объект."""
+        if not hasattr(self, '_users'):
+            user = self.request.user
+            self._users = {user.pk: user} if user.is_authenticated else {}
+        return self._users
+
+    def share_authors(self, objs):
+        """Подставляет один объект на каждого автора.
+
+        Автор текущего запроса заменяется на request.user, поэтому проверка
+        obj.author == request.user и сериализация не ходят в базу.
+        """
+        users = self.get_known_users()
+        for obj in objs:
+            obj.author = users.setdefault(obj.author_id, obj.author)
+        return objs
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        return page if page is None else self.share_authors(page)
+
+    def check_object_permissions(self, request, obj):
+        self.share_authors([obj])
+        super().check_object_permissions(request, obj)
+
+    def get_version_queryset(self):
+        """Родитель проверяется всегда, объект - для карточки.
+
+        get_parent() отвечает 404 на несуществующий маршрут и запоминает
+        родителя, так что список его повторно не загружает.
+        """
+        queryset = self.get_queryset()
+        if self.is_detail_request():
+            return queryset.filter(pk=self.kwargs['pk'])
+        return None
+
+
+class CategoryGenreMixinViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     http_method_names = ('get', 'post', 'delete')
     permission_classes = [IsAdminOrReadOnly]
-    pagination_class = PageNumberPagination
+    pagination_class = CountModePagination
     lookup_field = 'slug'
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     search_fields = ['name']
@@ -54,32 +320,106 @@ class CategoryGenreMixinViewSet(viewsets.ModelViewSet):
 class CategoryViewSet(CategoryGenreMixinViewSet):
     queryset = Category.objects.all().order_by('id')
     serializer_class = CategorySerializer
+    cache_models = (Category,)
 
 
 class GenreViewSet(CategoryGenreMixinViewSet):
     queryset = Genre.objects.all().order_by('id')
     serializer_class = GenreSerializer
+    cache_models = (Genre,)
 
 
-class TitleViewSet(BanPutHeadOptionsMethodsMixinViewSet):
-    queryset = Title.objects.all().annotate(
-        rating=Avg('reviews__score')).order_by('rating')
+class TitleViewSet(CachedResponseMixin, ConditionalGetMixin,
+                   BanPutHeadOptionsMethodsMixinViewSet):
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    ).order_by('rating', 'id')
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, TitleSearchFilter]
     filterset_class = TitleFilter
-    pagination_class = PageNumberPagination
+    pagination_class = PageNumberOrKeysetPagination
+    cache_models = (Title, Title.genre.through, Category, Genre, Review)
+
+    def get_cache_tables(self):
+        return super().get_cache_tables() + [FTS_TABLE]
+
+    def get_version_tables(self):
+        if not self.is_detail_request():
+            return self.get_cache_tables()
+        return [
+            scoped_table(Title, id=self.kwargs['pk']),
+            Title.genre.through._meta.db_table,
+            Category._meta.db_table,
+            Genre._meta.db_table,
+        ]
+
+    def get_version_queryset(self):
+        if self.is_detail_request():
+            return Title.objects.filter(pk=self.kwargs['pk'])
+        return None
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
 
     def get_serializer_class(self):
         if self.action in ['create', 'partial_update']:
             return TitleCreateSerializer
+        if self.action == 'top':
+            return TopTitleSerializer
         return TitleSerializer
 
+    def get_serializer_context(self):
+        """Списки отдают гистограмму оценок только с ?include=scores."""
+        context = super().get_serializer_context()
+        context['include_scores'] = (
+            self.is_detail_request()
+            or 'scores' in self.request.query_params.get(
+                'include', ''
+            ).split(',')
+        )
+        return context
+
+    def get_leaderboard_scope(self):
+        params = self.request.query_params
+        if 'category' in params:
+            slug = get_object_or_404(Category, slug=params['category']).slug
+            return category_scope(slug)
+        if 'genre' in params:
+            slug = get_object_or_404(Genre, slug=params['genre']).slug
+            return genre_scope(slug)
+        return OVERALL
+
+    @action(methods=['get'], detail=False, url_path='top')
+    def top(self, request):
+        """Лучшие произведения по байесовской оценке.
+
+        Средняя оценка подтягивается к общей средней по всем отзывам, пока
+        отзывов мало, поэтому одна десятка не обгоняет сотню девяток.
+        """
+        try:
+            limit = min(int(request.query_params.get(
+                'limit', settings.LEADERBOARD_SIZE
+            )), settings.LEADERBOARD_SIZE)
+        except ValueError:
+            limit = settings.LEADERBOARD_SIZE
+        board = top_titles(self.get_leaderboard_scope(), max(limit, 0))
+        titles = self.get_queryset().in_bulk(
+            [title_id for _, title_id in board]
+        )
+        top = []
+        for score, title_id in board:
+            if title_id in titles:
+                titles[title_id].bayesian_rating = score
+                top.append(titles[title_id])
+        return Response(self.get_serializer(top, many=True).data)
+
 
-class UserViewSet(BanPutHeadOptionsMethodsMixinViewSet):
+class UserViewSet(ConditionalGetMixin, BanPutHeadOptionsMethodsMixinViewSet):
     lookup_field = 'username'
     queryset = User.objects.all()
     serializer_class = UserSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = PageNumberOrKeysetPagination
     permission_classes = (IsAdmin,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
@@ -93,46 +433,222 @@ class UserViewSet(BanPutHeadOptionsMethodsMixinViewSet):
     )
     def users_own_profile(self, request):
         user = request.user
+        self.version_row = (user.pk, user.version)
         if request.method == 'PATCH':
             serializer = self.get_serializer(
                 user, data=request.data, partial=True
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save()
+            self.perform_update(serializer)
         else:
             serializer = self.get_serializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def get_version_tables(self):
+        """Условные запросы для списка, карточки и users/me/.
+
+        ETag users/me/ строится по id и version того, кто спрашивает,
+        поэтому у разных пользователей он разный.
+        """
+        if self.action_map.get('get') not in (
+            'list', 'retrieve', 'users_own_profile'
+        ):
+            return None
+        return [User._meta.db_table]
+
+    def load_version_row(self):
+        """Строка users/me/ уже загружена аутентификацией."""
+        if self.action == 'users_own_profile':
+            user = self.request.user
+            self.version_row = (user.pk, user.version)
+            return True
+        return super().load_version_row()
+
+    def get_version_queryset(self):
+        if self.is_detail_request():
+            return User.objects.filter(username=self.kwargs['username'])
+        return None
+
+    def get_history(self, queryset):
+        """Отзывы или комментарии пользователя, от новых к старым.
+
+        Курсор идёт по индексу (author, pub_date, id), так что страница не
+        зависит от того, сколько всего написал пользователь.
+        """
+        author = get_object_or_404(
+            User.objects.only('username'), username=self.kwargs['username']
+        )
+        page = self.paginate_queryset(
+            queryset.filter(author=author).select_related('author')
+        )
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
-class ReviewViewSet(BaseReviewViewSet):
-    serializer_class = ReviewSerializer
+    @action(
+        methods=['get'],
+        detail=True,
+        permission_classes=(IsAdminOrModerator,),
+        serializer_class=RecentReviewSerializer,
+        pagination_class=KeysetPagination,
+    )
+    def reviews(self, request, username=None):
+        return self.get_history(Review.objects.select_related('title').only(
+            'text', 'score', 'pub_date', 'comment_count',
+            'author', 'author__username', 'title', 'title__name',
+        ))
 
-    def fetch_title(self):
-        return self.get_instance(Title, self.kwargs['title_id'])
+    @action(
+        methods=['get'],
+        detail=True,
+        permission_classes=(IsAdminOrModerator,),
+        serializer_class=CommentHistorySerializer,
+        pagination_class=KeysetPagination,
+    )
+    def comments(self, request, username=None):
+        return self.get_history(Comment.objects.select_related('review').only(
+            'text', 'pub_date', 'author', 'author__username',
+            'review', 'review__title',
+        ))
 
-    def perform_create(self, serializer):
-        title = self.fetch_title()
-        serializer.save(author=self.request.user, title=title)
 
-    def get_queryset(self):
-        return self.fetch_title().reviews.all()
+class ReviewViewSet(ConditionalGetMixin, BaseReviewViewSet):
+    serializer_class = ReviewSerializer
+    parent_model = Title
+    parent_lookups = {'pk': 'title_id'}
+    related_name = 'reviews'
+    only_fields = ('text', 'score', 'pub_date', 'comment_count', 'title',
+                   'version')
+
+    def get_version_tables(self):
+        if self.is_detail_request():
+            return [
+                scoped_table(
+                    Review, id=self.kwargs['pk'], title=self.kwargs['title_id']
+                ),
+                User._meta.db_table,
+            ]
+        return [
+            scoped_table(Review, title=self.kwargs['title_id']),
+            User._meta.db_table,
+        ]
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
 
+    def perform_create(self, serializer):
+        """Повторный отзыв отсекает ограничение unique_author_title.
+
+        Предварительная проверка exists() стоила бы лишнего запроса и всё
+        равно пропускала бы параллельные запросы. Счётчики рейтинга
+        обновляются сигналом в той же транзакции, что и INSERT.
+        """
+        title = self.get_parent()
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [
+                    settings.REVIEW_EXISTS_ERROR
+                ]}
+            )
 
-class CommentViewSet(BaseReviewViewSet):
-    serializer_class = CommentSerializer
 
-    def fetch_review(self):
-        return self.get_instance(Review, self.kwargs['review_id'])
+class CommentViewSet(ConditionalGetMixin, BaseReviewViewSet):
+    serializer_class = CommentSerializer
+    parent_model = Review
+    parent_lookups = {'pk': 'review_id', 'title': 'title_id'}
+    related_name = 'comments'
+    only_fields = ('text', 'pub_date', 'review', 'version')
+
+    def get_version_tables(self):
+        if self.is_detail_request():
+            return [
+                scoped_table(Comment, id=self.kwargs['pk']),
+                User._meta.db_table,
+            ]
+        return [
+            scoped_table(Comment, review=self.kwargs['review_id']),
+            User._meta.db_table,
+        ]
+
+    def get_archive_queryset(self):
+        """Архив продолжает список после последнего живого комментария."""
+        if self.action != 'list':
+            return None
+        return self.get_parent().archived_comments.select_related(
+            'author'
+        ).only('compressed_text', 'pub_date', 'review', 'author',
+               'author__username')
+
+    def get_object(self):
+        """Архивный комментарий можно прочитать и удалить, но не изменить."""
+        try:
+            return super().get_object()
+        except Http404:
+            if self.request.method == 'PATCH':
+                raise
+        archived = get_object_or_404(
+            self.get_parent().archived_comments.select_related('author'),
+            pk=self.kwargs['pk'],
+        )
+        self.check_object_permissions(self.request, archived)
+        return archived
 
     def perform_create(self, serializer):
-        review = self.fetch_review()
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_parent())
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        """С COMMENT_WRITE_BEHIND комментарий пишется в базу пачкой позже.
+
+        Данные и маршрут проверяются сразу, а клиент получает 202 и
+        временный ключ вместо id.
+        """
+        if not settings.COMMENT_WRITE_BEHIND:
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        key = enqueue(
+            self.get_parent().pk,
+            request.user.pk,
+            serializer.validated_data['text'],
+        )
+        return Response(
+            {
+                'provisional_id': key,
+                'text': serializer.validated_data['text'],
+                'author': request.user.username,
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
 
-    def get_queryset(self):
-        return self.fetch_review().comments.all()
+
+class RecentReviewViewSet(CachedResponseMixin, mixins.ListModelMixin,
+                          viewsets.GenericViewSet):
+    """Лента новых отзывов по всем произведениям.
+
+    Курсор по (pub_date, id) опирается на индекс по pub_date, поэтому
+    страница стоит одинаково при любом размере таблицы.
+    """
+    queryset = Review.objects.select_related('author', 'title').only(
+        'text', 'score', 'pub_date', 'comment_count',
+        'author', 'author__username', 'title', 'title__name',
+    )
+    serializer_class = RecentReviewSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = RecentReviewFilter
+    # comment_count в ленте меняют записи комментариев, а не отзывов.
+    cache_models = (
+        Review, Comment, ArchivedComment, Title, Title.genre.through,
+        Category, Genre, User,
+    )
 
 
 @api_view(['POST'])
+@idempotent
 def signup(request):
     serializer = SignupSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -160,3 +676,9 @@ def get_token(request):
         token = AccessToken.for_user(user)
         return Response({'token': str(token)}, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes((IsAdmin,))
+def cache_stats(request):
+    return Response(get_response_cache_stats(), status=status.HTTP_200_OK)
@@ -73,6 +73,34 @@ DATABASES = {
 }
 
 
+# Cache
+
+# Версии таблиц, по которым устаревают кэш ответов и счётчики страниц,
+# хранятся в самом кэше. locmem держит их отдельно в каждом процессе:
+# при нескольких рабочих процессах запись в одном не сбрасывает кэш
+# других, и они отдают устаревшие ответы и счётчики до истечения
+# RESPONSE_CACHE_TIMEOUT и COUNT_CACHE_TIMEOUT.
+# Для такого развёртывания задайте CACHE_BACKEND=memcached (или file
+# на одной машине); locmem годится для одного процесса и тестов.
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    },
+    'memcached': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': os.getenv('MEMCACHED_LOCATION', '127.0.0.1:11211'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[os.getenv('CACHE_BACKEND', 'locmem')],
+}
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -150,8 +178,49 @@ CODE_LIMIT = 200
 
 LOGIN_OR_EMAIL_ERROR = 'Имя пользователя или почта уже используются'
 
+REVIEW_EXISTS_ERROR = 'Вы уже оставили отзыв для этого произведения'
+
 SNIPPET_LENGTH = 20
 
 MIN_SCORE_REVIEW = 1
 
 MAX_SCORE_REVIEW = 10
+
+COUNT_CACHE_TIMEOUT = 60
+
+RESPONSE_CACHE_TIMEOUT = 300
+
+LEADERBOARD_SIZE = 10
+
+LEADERBOARD_PRIOR_WEIGHT = 10
+
+LEADERBOARD_TIMEOUT = 60 * 60
+
+SCORE_PERCENTILES = (10, 25, 75, 90)
+
+COMMENT_WRITE_BEHIND = os.getenv('COMMENT_WRITE_BEHIND') == '1'
+
+COMMENT_JOURNAL = Path(os.getenv(
+    'COMMENT_JOURNAL', BASE_DIR / 'journal' / 'comments.jsonl'
+))
+
+COMMENT_JOURNAL_FSYNC = True
+
+COMMENT_BATCH_SIZE = 500
+
+COMMENT_FLUSH_INTERVAL = 1.0
+
+COMMENT_ARCHIVE_AFTER_DAYS = 730
+
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+# Бронь ключа без ответа старше этого срока считается брошенной.
+IDEMPOTENCY_LEASE = 60
+
+CSV_DATA_DIR = BASE_DIR / 'static' / 'data'
+
+LOAD_DATA_BATCH_SIZE = 5000
+
+LOAD_DATA_SHARD_SIZE = 4 * 1024 * 1024
+
+DUMP_DATA_CHUNK_SIZE = 5000
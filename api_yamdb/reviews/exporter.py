@@ -0,0 +1,178 @@
+import csv
+import gzip
+import multiprocessing
+import sqlite3
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta, timezone
+from pathlib import Path
+
+import django
+from django.db import connection, connections, reset_queries, transaction
+
+from reviews.importer import SOURCES
+from reviews.models import Comment, Review
+
+DATED_MODELS = (Review, Comment)
+
+
+def day_start(day):
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def format_value(value):
+    """Значение поля в том виде, в каком оно записано в static/data."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat(
+            timespec='milliseconds'
+        ).replace('+00:00', 'Z')
+    return value
+
+
+@contextmanager
+def read_snapshot(shared=False):
+    """Транзакция, все чтения которой видят один снимок базы.
+
+    С shared снимок передаётся рабочим процессам: PostgreSQL отдаёт id
+    экспортированного снимка, а для SQLite делается копия базы через
+    backup API, которую процессы читают вместо основной.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, '
+                    'READ ONLY'
+                )
+                snapshot = None
+                if shared:
+                    cursor.execute('SELECT pg_export_snapshot()')
+                    snapshot = cursor.fetchone()[0]
+            yield snapshot
+        elif connection.vendor == 'sqlite' and shared:
+            with tempfile.TemporaryDirectory() as directory:
+                copy = str(Path(directory) / 'snapshot.sqlite3')
+                connection.ensure_connection()
+                target = sqlite3.connect(copy)
+                try:
+                    connection.connection.backup(target)
+                finally:
+                    target.close()
+                yield copy
+        else:
+            yield None
+
+
+def write_table(source, path, compress, since, until, chunk_size):
+    """Пишет таблицу в CSV кусками по chunk_size строк в порядке id."""
+    fields = list(source.columns.values())
+    id_index = fields.index('id')
+    queryset = source.model.objects.order_by('pk').values_list(*fields)
+    if source.model in DATED_MODELS:
+        if since:
+            queryset = queryset.filter(pub_date__gte=day_start(since))
+        if until:
+            queryset = queryset.filter(
+                pub_date__lt=day_start(until + timedelta(days=1))
+            )
+    opener = gzip.open if compress else open
+    count = 0
+    last_pk = None
+    with opener(path, 'wt', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(source.columns)
+        while True:
+            if last_pk is not None:
+                chunk = queryset.filter(pk__gt=last_pk)
+            else:
+                chunk = queryset
+            chunk = list(chunk[:chunk_size])
+            if not chunk:
+                break
+            writer.writerows(
+                [format_value(value) for value in row] for row in chunk
+            )
+            last_pk = chunk[-1][id_index]
+            count += len(chunk)
+            reset_queries()
+    return count
+
+
+def dump_table(name, path, compress, since, until, chunk_size,
+               snapshot=None):
+    """Выгрузка одной таблицы в рабочем процессе из снимка read_snapshot()."""
+    source = next(source for source in SOURCES if source.name == name)
+    args = (source, path, compress, since, until, chunk_size)
+    try:
+        if connection.vendor == 'sqlite':
+            connection.close()
+            connection.settings_dict['NAME'] = snapshot
+            return write_table(*args)
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, '
+                    'READ ONLY'
+                )
+                cursor.execute('SET TRANSACTION SNAPSHOT %s', [snapshot])
+            return write_table(*args)
+    finally:
+        connections.close_all()
+
+
+class Exporter:
+    """Выгрузка таблиц в CSV в формате static/data.
+
+    Все таблицы читаются из одного снимка базы. С jobs больше одного
+    каждая таблица выгружается своим процессом; это поддерживается для
+    SQLite и PostgreSQL, с другими базами таблицы пишутся по очереди в
+    одной транзакции. since и until ограничивают даты отзывов и
+    комментариев включительно; комментарии отбираются по своей дате.
+    """
+
+    def __init__(self, path, compress=False, since=None, until=None,
+                 chunk_size=5000, jobs=1):
+        self.path = path
+        self.compress = compress
+        self.since = since
+        self.until = until
+        self.chunk_size = chunk_size
+        self.jobs = jobs
+
+    def get_path(self, source):
+        suffix = '.gz' if self.compress else ''
+        return self.path / f'{source.filename}{suffix}'
+
+    def run(self, sources=SOURCES):
+        self.path.mkdir(parents=True, exist_ok=True)
+        shared = self.jobs > 1 and connection.vendor in (
+            'sqlite', 'postgresql'
+        )
+        with read_snapshot(shared) as snapshot:
+            if not shared:
+                return {
+                    source.name: write_table(
+                        source, self.get_path(source), self.compress,
+                        self.since, self.until, self.chunk_size,
+                    )
+                    for source in sources
+                }
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(
+                min(self.jobs, len(sources)), mp_context=context,
+                initializer=django.setup,
+            ) as pool:
+                futures = {
+                    source.name: pool.submit(
+                        dump_table, source.name, self.get_path(source),
+                        self.compress, self.since, self.until,
+                        self.chunk_size, snapshot,
+                    )
+                    for source in sources
+                }
+                return {
+                    name: future.result() for name, future in futures.items()
+                }
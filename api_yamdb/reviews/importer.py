@@ -0,0 +1,719 @@
+import csv
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import connection, connections, reset_queries, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from api.cache import bump_table_version, scoped_table
+from api.versioning import VersionedModel
+from reviews.leaderboards import clear_all
+from reviews.models import (Category, Comment, Genre, ImportCheckpoint,
+                            ImportDigest, Review, Title)
+from reviews.scores import (TITLE_COUNTER_FIELDS, count_comments,
+                            count_scores, title_counters)
+from reviews.search import FTS_TABLE, fts_available, reindex_titles
+from users.models import User
+
+SKIP = 'skip'
+UPDATE = 'update'
+FAIL = 'fail'
+CONFLICT_MODES = (SKIP, UPDATE, FAIL)
+
+
+class ImportConflict(Exception):
+    """Запись с таким id уже есть, а конфликты запрещены."""
+
+
+class StaleCheckpoint(Exception):
+    """Файл короче сохранённого смещения: продолжать с него нельзя."""
+
+
+class Source:
+    """CSV-файл из static/data и модель, в которую он загружается.
+
+    columns сопоставляет колонки файла полям модели, parents - поля
+    внешних ключей источникам, на которые они ссылаются. title_field и
+    review_field указывают, счётчики каких произведений и отзывов надо
+    пересчитать после загрузки.
+    """
+
+    def __init__(self, name, model, columns, parents=None, defaults=None,
+                 title_field=None, review_field=None):
+        self.name = name
+        self.model = model
+        self.columns = columns
+        self.parents = parents or {}
+        self.defaults = defaults or {}
+        self.title_field = title_field
+        self.review_field = review_field
+
+    @property
+    def filename(self):
+        return f'{self.name}.csv'
+
+    @property
+    def update_fields(self):
+        fields = [name for name in self.columns.values() if name != 'id']
+        if issubclass(self.model, VersionedModel):
+            fields.append('version')
+        return fields
+
+    def values(self, row):
+        """Значения полей модели по строке CSV."""
+        values = dict(self.defaults)
+        for column, name in self.columns.items():
+            value = row[column]
+            if name == 'id' or name in self.parents:
+                value = int(value) if value else None
+            elif name == 'pub_date':
+                value = parse_datetime(value) if value else timezone.now()
+            values[name] = value
+        return values
+
+
+SOURCES = (
+    Source('category', Category, {'id': 'id', 'name': 'name',
+                                  'slug': 'slug'}),
+    Source('genre', Genre, {'id': 'id', 'name': 'name', 'slug': 'slug'}),
+    Source(
+        'users', User,
+        {'id': 'id', 'username': 'username', 'email': 'email',
+         'role': 'role', 'bio': 'bio', 'first_name': 'first_name',
+         'last_name': 'last_name'},
+        defaults={'password': UNUSABLE_PASSWORD_PREFIX},
+    ),
+    Source(
+        'titles', Title,
+        {'id': 'id', 'name': 'name', 'year': 'year',
+         'category': 'category_id'},
+        parents={'category_id': 'category'},
+        title_field='id',
+    ),
+    Source(
+        'genre_title', Title.genre.through,
+        {'id': 'id', 'title_id': 'title_id', 'genre_id': 'genre_id'},
+        parents={'title_id': 'titles', 'genre_id': 'genre'},
+        title_field='title_id',
+    ),
+    Source(
+        'review', Review,
+        {'id': 'id', 'title_id': 'title_id', 'text': 'text',
+         'author': 'author_id', 'score': 'score', 'pub_date': 'pub_date'},
+        parents={'title_id': 'titles', 'author_id': 'users'},
+        title_field='title_id',
+    ),
+    Source(
+        'comments', Comment,
+        {'id': 'id', 'review_id': 'review_id', 'text': 'text',
+         'author': 'author_id', 'pub_date': 'pub_date'},
+        parents={'review_id': 'review', 'author_id': 'users'},
+        review_field='review_id',
+    ),
+)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+@contextmanager
+def keep_pub_dates():
+    """Даёт сохранить pub_date из файла вместо текущего времени.
+
+    auto_now_add перезаписывает значение и в bulk_create, поэтому на время
+    загрузки он отключается.
+    """
+    fields = [Review._meta.get_field('pub_date'),
+              Comment._meta.get_field('pub_date')]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Importer:
+    """Загрузка CSV пачками bulk_create в одной транзакции.
+
+    Источники читаются в порядке зависимостей. id уже загруженных и
+    существующих строк каждой таблицы держатся в памяти, поэтому внешние
+    ключи проверяются без запросов к базе, а строки с несуществующим
+    родителем пропускаются. Сигналы при пакетной вставке не срабатывают,
+    поэтому счётчики, поисковый индекс и версии кэша обновляются в конце
+    загрузки, один раз для всех затронутых строк.
+    """
+
+    def __init__(self, path, on_conflict=SKIP, batch_size=5000):
+        self.path = path
+        self.on_conflict = on_conflict
+        self.batch_size = batch_size
+        self.ids = {}
+        self.stats = {}
+        self.titles = set()
+        self.indexed = set()
+        self.reviews = set()
+        self.updated = defaultdict(set)
+
+    def run(self, sources=SOURCES):
+        with transaction.atomic(), keep_pub_dates():
+            for source in sources:
+                self.load(source)
+            self.finish(sources)
+        return self.stats
+
+    def get_ids(self, source):
+        if source.name not in self.ids:
+            self.ids[source.name] = set(
+                source.model.objects.values_list('pk', flat=True)
+            )
+        return self.ids[source.name]
+
+    def load(self, source):
+        stats = self.stats[source.name] = Counter()
+        path = self.path / source.filename
+        if not path.exists():
+            stats['missing'] = 1
+            return
+        existing = self.get_ids(source)
+        parents = {
+            name: self.get_ids(self.get_source(parent))
+            for name, parent in source.parents.items()
+        }
+        with open(path, encoding='utf-8', newline='') as file:
+            for rows in batched(csv.DictReader(file), self.batch_size):
+                self.load_batch(
+                    source, [source.values(row) for row in rows],
+                    existing, parents, stats,
+                )
+
+    def get_source(self, name):
+        return next(source for source in SOURCES if source.name == name)
+
+    def load_batch(self, source, rows, existing, parents, stats):
+        """Записывает пачку значений, уже разобранных Source.values().
+
+        Возвращает созданные и обновлённые объекты.
+        """
+        created, updated = [], []
+        for values in rows:
+            obj = source.model(**values)
+            if any(
+                getattr(obj, name) is not None
+                and getattr(obj, name) not in ids
+                for name, ids in parents.items()
+            ):
+                stats['orphaned'] += 1
+                continue
+            if obj.pk not in existing:
+                existing.add(obj.pk)
+                created.append(obj)
+            elif self.on_conflict == FAIL:
+                raise ImportConflict(
+                    f'{source.filename}: запись с id={obj.pk} уже есть.'
+                )
+            elif self.on_conflict == UPDATE:
+                updated.append(obj)
+            else:
+                stats['skipped'] += 1
+
+        source.model.objects.bulk_create(created, batch_size=self.batch_size)
+        if updated:
+            fields = [name for name in (source.title_field,
+                                        source.review_field) if name]
+            if fields:
+                self.touch(source, source.model.objects.filter(
+                    pk__in=[obj.pk for obj in updated]
+                ).only(*fields))
+            if 'version' in source.update_fields:
+                for obj in updated:
+                    obj.version = F('version') + 1
+            source.model.objects.bulk_update(
+                updated, source.update_fields, batch_size=self.batch_size
+            )
+            self.updated[source.model].update(obj.pk for obj in updated)
+        self.touch(source, created + updated)
+        stats['created'] += len(created)
+        stats['updated'] += len(updated)
+        return created + updated
+
+    def touch(self, source, objs):
+        """Запоминает произведения и отзывы, чьи счётчики могли сдвинуться.
+
+        Для обновляемых строк сюда попадают и старые значения ссылок.
+        Строки самих произведений ещё и переиндексируются для поиска.
+        """
+        for obj in objs:
+            if source.model is Title:
+                self.indexed.add(obj.pk)
+            if source.title_field:
+                self.titles.add(getattr(obj, source.title_field))
+            if source.review_field:
+                self.reviews.add(getattr(obj, source.review_field))
+
+    def finish(self, sources):
+        self.refresh_counters()
+        self.reindex()
+        if self.titles:
+            transaction.on_commit(clear_all)
+        self.bump_versions(sources)
+
+    def reindex(self):
+        """Переиндексирует только произведения, записанные из titles.csv.
+
+        Отзывы и связи с жанрами меняют счётчики произведения, но не его
+        название и описание, поэтому поисковый индекс не трогают.
+        """
+        if not self.indexed or not fts_available():
+            return
+        for chunk in batched(sorted(self.indexed), self.batch_size):
+            reindex_titles(chunk)
+        bump_table_version(FTS_TABLE)
+
+    def refresh_counters(self):
+        for chunk in batched(sorted(self.titles), self.batch_size):
+            self.recount_titles(chunk)
+        for chunk in batched(sorted(self.reviews), self.batch_size):
+            self.recount_reviews(chunk)
+
+    def recount_titles(self, title_ids):
+        """Счётчики рейтинга по отзывам; пишутся только разошедшиеся."""
+        histograms = count_scores(title_ids)
+        current = Title.objects.filter(pk__in=title_ids).values_list(
+            'pk', *TITLE_COUNTER_FIELDS
+        )
+        for pk, *counters in current:
+            expected = title_counters(histograms[pk])
+            if counters != expected:
+                Title.objects.filter(pk=pk).update(
+                    **dict(zip(TITLE_COUNTER_FIELDS, expected))
+                )
+
+    def recount_reviews(self, review_ids):
+        totals = count_comments(review_ids)
+        current = Review.objects.filter(pk__in=review_ids).values_list(
+            'pk', 'comment_count'
+        )
+        for pk, count in current:
+            if count != totals[pk]:
+                Review.objects.filter(pk=pk).update(comment_count=totals[pk])
+
+    def bump_versions(self, sources):
+        for source in sources:
+            stats = self.stats[source.name]
+            if stats['created'] or stats['updated'] or stats['deleted']:
+                bump_table_version(source.model._meta.db_table)
+        for title_id in self.titles:
+            bump_table_version(scoped_table(Title, id=title_id))
+            bump_table_version(scoped_table(Review, title=title_id))
+        for review_id in self.reviews:
+            bump_table_version(scoped_table(Comment, review=review_id))
+        # Версия карточки отзыва привязана и к его произведению.
+        review_ids = sorted(self.reviews | self.updated[Review])
+        for chunk in batched(review_ids, self.batch_size):
+            for pk, title_id in Review.objects.filter(
+                pk__in=chunk
+            ).values_list('pk', 'title_id'):
+                bump_table_version(scoped_table(Review, id=pk, title=title_id))
+        for pk in self.updated[Comment]:
+            bump_table_version(scoped_table(Comment, id=pk))
+
+
+class StreamingImporter(Importer):
+    """Потоковая загрузка больших файлов с контрольными точками.
+
+    Файл читается пачками по batch_size строк, и каждая пачка фиксируется
+    отдельной транзакцией вместе с байтовым смещением своего конца в
+    ImportCheckpoint. Сбой теряет не больше одной пачки, а resume
+    продолжает чтение с сохранённого смещения. В памяти держится только
+    текущая пачка: существующие id и родители ищутся запросом по id
+    пачки, счётчики и поисковый индекс обновляются сразу для её строк.
+    """
+
+    def __init__(self, path, on_conflict=SKIP, batch_size=5000,
+                 resume=False, progress=None):
+        super().__init__(path, on_conflict, batch_size)
+        self.resume = resume
+        self.progress = progress
+
+    def run(self, sources=SOURCES):
+        with keep_pub_dates():
+            for source in sources:
+                self.load(source)
+        return self.stats
+
+    def get_checkpoint(self, path):
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+            path=str(path.resolve())
+        )
+        if not self.resume:
+            checkpoint.offset = checkpoint.rows = 0
+            checkpoint.save()
+        elif checkpoint.offset > path.stat().st_size:
+            raise StaleCheckpoint(
+                f'{path.name} короче сохранённой позиции '
+                f'{checkpoint.offset} байт.'
+            )
+        return checkpoint
+
+    def load(self, source):
+        stats = self.stats[source.name] = Counter()
+        path = self.path / source.filename
+        if not path.exists():
+            stats['missing'] = 1
+            return
+        checkpoint = self.get_checkpoint(path)
+        stats['resumed'] = checkpoint.rows
+        with open(path, 'rb') as file:
+            # csv.reader забирает строки по одной, поэтому после каждой
+            # записи file.tell() указывает ровно на начало следующей.
+            reader = csv.reader(
+                line.decode('utf-8') for line in iter(file.readline, b'')
+            )
+            header = next(reader, None)
+            if header is None:
+                return
+            if checkpoint.offset > file.tell():
+                file.seek(checkpoint.offset)
+            started = time.perf_counter()
+            loaded = 0
+            for values in batched(reader, self.batch_size):
+                rows = [source.values(dict(zip(header, row)))
+                        for row in values]
+                with transaction.atomic():
+                    self.load_batch(
+                        source, rows, *self.lookup(source, rows), stats
+                    )
+                    self.finish_batch(source)
+                    ImportCheckpoint.objects.filter(pk=checkpoint.pk).update(
+                        offset=file.tell(),
+                        rows=F('rows') + len(rows),
+                        updated=timezone.now(),
+                    )
+                # С DEBUG=True журнал запросов иначе растёт с каждой пачкой.
+                reset_queries()
+                loaded += len(rows)
+                if self.progress is not None:
+                    elapsed = time.perf_counter() - started
+                    self.progress(source, loaded, loaded / elapsed)
+
+    def lookup(self, source, rows):
+        """Какие id пачки уже есть в базе и какие родители найдены."""
+        def present(model, name):
+            values = {values[name] for values in rows if values[name]}
+            return set(model.objects.filter(pk__in=values).values_list(
+                'pk', flat=True
+            ))
+
+        parents = {
+            name: present(self.get_source(parent).model, name)
+            for name, parent in source.parents.items()
+        }
+        return present(source.model, 'id'), parents
+
+    def finish_batch(self, source):
+        self.refresh_counters()
+        self.reindex()
+        if self.titles:
+            transaction.on_commit(clear_all)
+        self.bump_versions([source])
+        self.titles.clear()
+        self.indexed.clear()
+        self.reviews.clear()
+        self.updated.clear()
+
+
+def row_digest(values):
+    """64-битный хэш значений строки CSV."""
+    digest = hashlib.blake2b('\x1f'.join(values).encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), 'big', signed=True)
+
+
+class SyncImporter(Importer):
+    """Синхронизация с выгрузкой: пишутся только изменившиеся строки.
+
+    Для каждой загруженной строки в ImportDigest хранится хэш её значений
+    в файле. Строка, чей хэш совпал с сохранённым и чья запись есть в
+    базе, даже не разбирается; новые и изменившиеся строки добавляются
+    или обновляются. С delete записи, строки которых пропали из файла,
+    удаляются. Правки через API хэш не меняют, поэтому такие записи
+    перезаписываются, только когда изменится их строка в файле.
+    """
+
+    def __init__(self, path, batch_size=5000, delete=False):
+        super().__init__(path, UPDATE, batch_size)
+        self.delete = delete
+        self.seen = {}
+
+    def run(self, sources=SOURCES):
+        with transaction.atomic(), keep_pub_dates():
+            for source in sources:
+                self.load(source)
+            if self.delete:
+                deleted = Counter()
+                # Сначала зависимые таблицы: каскад от родителей их заденет.
+                for source in reversed(sources):
+                    self.remove(source, deleted)
+                for source in sources:
+                    self.stats[source.name]['deleted'] = deleted[
+                        source.model._meta.label
+                    ]
+            self.finish(sources)
+        return self.stats
+
+    def load(self, source):
+        stats = self.stats[source.name] = Counter()
+        path = self.path / source.filename
+        if not path.exists():
+            stats['missing'] = 1
+            return
+        existing = self.get_ids(source)
+        parents = {
+            name: self.get_ids(self.get_source(parent))
+            for name, parent in source.parents.items()
+        }
+        digests = dict(ImportDigest.objects.filter(
+            table=source.name
+        ).values_list('row_id', 'digest'))
+        changed = []
+        with open(path, encoding='utf-8', newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return
+            seen = self.seen[source.name] = set()
+            positions = [header.index(column) for column in source.columns]
+            id_position = header.index('id')
+            for row in reader:
+                if not row:
+                    continue
+                pk = int(row[id_position])
+                seen.add(pk)
+                digest = row_digest([row[index] for index in positions])
+                if pk in existing and digests.get(pk) == digest:
+                    stats['unchanged'] += 1
+                    continue
+                changed.append(
+                    (source.values(dict(zip(header, row))), digest)
+                )
+                if len(changed) == self.batch_size:
+                    self.sync_batch(source, changed, existing, parents, stats)
+                    changed = []
+        if changed:
+            self.sync_batch(source, changed, existing, parents, stats)
+
+    def sync_batch(self, source, changed, existing, parents, stats):
+        written = {obj.pk for obj in self.load_batch(
+            source, [values for values, _ in changed], existing, parents,
+            stats,
+        )}
+        # Строки с несуществующим родителем хэш не получают и будут
+        # проверены снова при следующей синхронизации.
+        digests = {values['id']: digest for values, digest in changed
+                   if values['id'] in written}
+        ImportDigest.objects.filter(
+            table=source.name, row_id__in=digests
+        ).delete()
+        ImportDigest.objects.bulk_create(
+            [ImportDigest(table=source.name, row_id=pk, digest=digest)
+             for pk, digest in digests.items()],
+            batch_size=self.batch_size,
+        )
+
+    def remove(self, source, deleted):
+        """Удаляет записи, загруженные из файла, но пропавшие из него."""
+        if source.name not in self.seen:
+            return
+        gone = set(ImportDigest.objects.filter(
+            table=source.name
+        ).values_list('row_id', flat=True)) - self.seen[source.name]
+        fields = [name for name in (source.title_field,
+                                    source.review_field) if name]
+        for chunk in batched(sorted(gone), self.batch_size):
+            queryset = source.model.objects.filter(pk__in=chunk)
+            if fields:
+                self.touch(source, queryset.only(*fields))
+            deleted.update(queryset.delete()[1])
+            self.updated[source.model].update(chunk)
+            ImportDigest.objects.filter(
+                table=source.name, row_id__in=chunk
+            ).delete()
+
+
+def plan_shards(path, size):
+    """Заголовок файла и границы его кусков примерно по size байт.
+
+    Кусок заканчивается только на переводе строки вне кавычек: поле в
+    кавычках может занимать несколько строк, поэтому граница сдвигается
+    вперёд, пока число кавычек от начала куска не станет чётным.
+    """
+    with open(path, 'rb') as file:
+        reader = csv.reader(
+            line.decode('utf-8') for line in iter(file.readline, b'')
+        )
+        header = next(reader, None)
+        start = file.tell()
+        end_of_file = os.fstat(file.fileno()).st_size
+        shards = []
+        while start < end_of_file:
+            quotes = file.read(size).count(b'"')
+            for line in iter(file.readline, b''):
+                quotes += line.count(b'"')
+                if quotes % 2 == 0:
+                    break
+            end = file.tell()
+            shards.append((start, end))
+            start = end
+    return header, shards
+
+
+def parse_shard(name, path, start, end, header):
+    """Разбирает кусок файла в значения полей модели."""
+    source = next(source for source in SOURCES if source.name == name)
+    with open(path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start).decode('utf-8')
+    return [
+        source.values(dict(zip(header, row)))
+        for row in csv.reader(io.StringIO(data, newline='')) if row
+    ]
+
+
+def write_rows(name, rows, on_conflict, batch_size):
+    """Записывает разобранные строки пачками по транзакции на пачку.
+
+    Возвращает статистику и id строк, чьи счётчики, поисковый индекс и
+    кэш надо обновить.
+    """
+    importer = StreamingImporter(None, on_conflict, batch_size)
+    source = importer.get_source(name)
+    stats = Counter()
+    for batch in batched(rows, batch_size):
+        with transaction.atomic():
+            importer.load_batch(
+                source, batch, *importer.lookup(source, batch), stats
+            )
+        reset_queries()
+    return (stats, importer.titles, importer.indexed, importer.reviews,
+            importer.updated)
+
+
+def load_shard(name, path, start, end, header, on_conflict, batch_size):
+    """Разбор и запись куска в рабочем процессе, для серверных баз."""
+    rows = parse_shard(name, path, start, end, header)
+    try:
+        with keep_pub_dates():
+            return write_rows(name, rows, on_conflict, batch_size)
+    finally:
+        connections.close_all()
+
+
+class ParallelImporter(Importer):
+    """Параллельная загрузка: файлы режутся на куски для пула процессов.
+
+    Каждый источник загружается своим потоком, который ждёт только
+    источники, на которые ссылается, поэтому независимые таблицы идут
+    одновременно, а зависимая начинается сразу после своих родителей.
+    SQLite допускает одного писателя: процессы только разбирают куски, а
+    пишет их по очереди один поток. С серверной базой процессы сами
+    пишут свои куски. Пачки фиксируются отдельными транзакциями, как в
+    потоковом режиме; счётчики, поисковый индекс и версии кэша
+    обновляются один раз после всех таблиц.
+    """
+
+    def __init__(self, path, on_conflict=SKIP, batch_size=5000, jobs=2,
+                 shard_size=4 * 1024 * 1024, progress=None):
+        super().__init__(path, on_conflict, batch_size)
+        self.jobs = jobs
+        self.shard_size = shard_size
+        self.progress = progress
+        self.lock = threading.Lock()
+
+    def run(self, sources=SOURCES):
+        self.single_writer = connection.vendor == 'sqlite'
+        context = multiprocessing.get_context('spawn')
+        with keep_pub_dates(), ProcessPoolExecutor(
+            self.jobs, mp_context=context, initializer=django.setup
+        ) as self.pool, ThreadPoolExecutor(1) as self.writer:
+            stages = {}
+            with ThreadPoolExecutor(len(sources)) as executor:
+                for source in sources:
+                    parents = [stages[name] for name in source.parents.values()
+                               if name in stages]
+                    stages[source.name] = executor.submit(
+                        self.load_stage, source, parents
+                    )
+                try:
+                    for stage in stages.values():
+                        stage.result()
+                finally:
+                    self.writer.submit(connections.close_all).result()
+        with transaction.atomic():
+            self.finish(sources)
+        # Таблицы заканчиваются в любом порядке, отчёт - в порядке файлов.
+        return {source.name: self.stats[source.name] for source in sources}
+
+    def load_stage(self, source, parents):
+        for parent in parents:
+            parent.result()
+        stats = self.stats[source.name] = Counter()
+        path = self.path / source.filename
+        if not path.exists():
+            stats['missing'] = 1
+            return
+        header, shards = plan_shards(path, self.shard_size)
+        started = time.perf_counter()
+        # Окно ограничивает число разобранных, но не записанных кусков.
+        pending = deque()
+        for start, end in shards:
+            if self.single_writer:
+                pending.append(self.pool.submit(
+                    parse_shard, source.name, path, start, end, header
+                ))
+            else:
+                pending.append(self.pool.submit(
+                    load_shard, source.name, path, start, end, header,
+                    self.on_conflict, self.batch_size,
+                ))
+            if len(pending) > self.jobs:
+                self.merge(source, pending.popleft().result(), started)
+        while pending:
+            self.merge(source, pending.popleft().result(), started)
+
+    def merge(self, source, result, started):
+        if self.single_writer:
+            result = self.writer.submit(
+                write_rows, source.name, result, self.on_conflict,
+                self.batch_size,
+            ).result()
+        stats, titles, indexed, reviews, updated = result
+        with self.lock:
+            self.stats[source.name].update(stats)
+            self.titles.update(titles)
+            self.indexed.update(indexed)
+            self.reviews.update(reviews)
+            for model, pks in updated.items():
+                self.updated[model].update(pks)
+            loaded = sum(self.stats[source.name].values())
+        if self.progress is not None:
+            elapsed = time.perf_counter() - started
+            self.progress(source, loaded, loaded / elapsed)
@@ -0,0 +1,171 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, FloatField, Sum
+from django.db.models.functions import Cast
+
+from reviews.models import Category, Genre, Title
+
+OVERALL = 'overall'
+BOARD_KEY = 'leaderboard:{}'
+SCOPES_KEY = 'leaderboard:scopes'
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+def genre_scope(slug):
+    return f'genre:{slug}'
+
+
+def board_capacity():
+    return settings.LEADERBOARD_SIZE * 2
+
+
+def global_mean():
+    totals = Title.objects.aggregate(
+        score_sum=Sum('score_sum'), review_count=Sum('review_count')
+    )
+    if not totals['review_count']:
+        return 0.0
+    return totals['score_sum'] / totals['review_count']
+
+
+def bayesian_score(score_sum, review_count, mean, weight):
+    return (weight * mean + score_sum) / (weight + review_count)
+
+
+def scope_titles(scope):
+    titles = Title.objects.filter(review_count__gt=0)
+    if scope == OVERALL:
+        return titles
+    kind, slug = scope.split(':', 1)
+    if kind == 'category':
+        return titles.filter(category__slug=slug)
+    return titles.filter(genre__slug=slug)
+
+
+def build_board(scope):
+    mean = global_mean()
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    capacity = board_capacity()
+    rows = list(scope_titles(scope).annotate(
+        bayesian=(Cast(F('score_sum'), FloatField()) + weight * mean)
+        / (F('review_count') + weight)
+    ).order_by('-bayesian', 'id').values_list('bayesian', 'id')[
+        :capacity + 1
+    ])
+    board = {
+        'entries': [list(row) for row in rows[:capacity]],
+        'complete': len(rows) <= capacity,
+        'mean': mean,
+        'weight': weight,
+    }
+    store_boards({scope: board})
+    return board
+
+
+def store_boards(boards):
+    cache.set_many(
+        {BOARD_KEY.format(scope): board for scope, board in boards.items()},
+        settings.LEADERBOARD_TIMEOUT,
+    )
+    scopes = cache.get(SCOPES_KEY, set())
+    if not boards.keys() <= scopes:
+        cache.set(SCOPES_KEY, scopes | boards.keys(), None)
+
+
+def get_board(scope):
+    board = cache.get(BOARD_KEY.format(scope))
+    if board is None:
+        board = build_board(scope)
+    return board
+
+
+def top_titles(scope, limit):
+    """Пары (байесовская оценка, id) лучших произведений области."""
+    return [tuple(entry) for entry in get_board(scope)['entries'][:limit]]
+
+
+def place_title(board, title_id, sum_and_count):
+    """Обновляет место произведения в списке лучших.
+
+    Список хранит не больше 2 * LEADERBOARD_SIZE пар (оценка, id), и любое
+    произведение области, которого в списке нет, оценено не выше последнего
+    элемента. Если неполный список стал короче LEADERBOARD_SIZE, возвращается
+    None: его надо строить заново.
+    """
+    entries = [entry for entry in board['entries'] if entry[1] != title_id]
+    if sum_and_count is not None:
+        score = bayesian_score(*sum_and_count, board['mean'], board['weight'])
+        if board['complete'] or (
+            entries and (-score, title_id) < (-entries[-1][0], entries[-1][1])
+        ):
+            entries.append([score, title_id])
+            entries.sort(key=lambda entry: (-entry[0], entry[1]))
+    if len(entries) > board_capacity():
+        entries.pop()
+        board['complete'] = False
+    if not board['complete'] and len(entries) < settings.LEADERBOARD_SIZE:
+        return None
+    board['entries'] = entries
+    return board
+
+
+def refresh_title(title_id):
+    """Переносит свежие счётчики произведения во все списки в кэше."""
+    scopes = cache.get(SCOPES_KEY, set())
+    if not scopes:
+        return
+    title = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    ).filter(pk=title_id).first()
+    title_scopes = set()
+    if title is not None and title.review_count:
+        title_scopes.add(OVERALL)
+        if title.category is not None:
+            title_scopes.add(category_scope(title.category.slug))
+        title_scopes.update(genre_scope(genre.slug)
+                            for genre in title.genre.all())
+
+    keys = {BOARD_KEY.format(scope): scope for scope in scopes}
+    updated, stale = {}, []
+    for key, board in cache.get_many(keys).items():
+        scope = keys[key]
+        in_scope = scope in title_scopes
+        if not in_scope and all(
+            entry[1] != title_id for entry in board['entries']
+        ):
+            continue
+        board = place_title(
+            board,
+            title_id,
+            (title.score_sum, title.review_count) if in_scope else None,
+        )
+        if board is None:
+            stale.append(key)
+        else:
+            updated[scope] = board
+    if updated:
+        store_boards(updated)
+    if stale:
+        cache.delete_many(stale)
+
+
+def clear_all():
+    scopes = cache.get(SCOPES_KEY, set())
+    cache.delete_many([BOARD_KEY.format(scope) for scope in scopes])
+    cache.delete(SCOPES_KEY)
+
+
+def rebuild_all():
+    """Строит списки для всех категорий, жанров и общего рейтинга."""
+    clear_all()
+    scopes = [OVERALL]
+    scopes += [category_scope(slug) for slug in
+               Category.objects.values_list('slug', flat=True)]
+    scopes += [genre_scope(slug) for slug in
+               Genre.objects.values_list('slug', flat=True)]
+    for scope in scopes:
+        build_board(scope)
+    return len(scopes)
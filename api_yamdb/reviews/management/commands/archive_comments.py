@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api.cache import bump_table_version, scoped_table
+from reviews.models import ArchivedComment, Comment
+
+
+class Command(BaseCommand):
+    help = (
+        'Перенос старых комментариев в архив со сжатым текстом. Список '
+        'комментариев к отзыву продолжает показывать их после живых.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.COMMENT_ARCHIVE_AFTER_DAYS,
+            help='Архивировать комментарии старше этого числа дней.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Сколько комментариев переносить за одну транзакцию.',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        aged = Comment.objects.filter(pub_date__lt=cutoff).order_by('pk')
+        moved = 0
+        while True:
+            with transaction.atomic():
+                chunk = list(aged.only(
+                    'text', 'pub_date', 'review', 'author'
+                )[:options['chunk_size']])
+                if not chunk:
+                    break
+                ArchivedComment.objects.bulk_create(
+                    ArchivedComment.from_comment(comment) for comment in chunk
+                )
+                # Без сигналов: комментарии не удалены, а перенесены, и
+                # comment_count отзывов учитывает архив.
+                Comment.objects.filter(
+                    pk__in=[comment.pk for comment in chunk]
+                )._raw_delete(Comment.objects.db)
+                for review_id in {comment.review_id for comment in chunk}:
+                    bump_table_version(
+                        scoped_table(Comment, review=review_id)
+                    )
+                bump_table_version(Comment._meta.db_table)
+                bump_table_version(ArchivedComment._meta.db_table)
+            moved += len(chunk)
+            self.stdout.write(f'Перенесено комментариев: {moved}.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Архивировано комментариев: {moved}.'
+        ))
@@ -0,0 +1,71 @@
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+
+from api.ingest import enqueue, flush
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнение скорости записи комментариев: по транзакции на '
+        'комментарий и через журнал с пакетным сбросом.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=2000,
+            help='Сколько комментариев записать каждым способом.',
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        author = User.objects.create(
+            username='bench_comment_ingest', email='bench@yamdb.fake'
+        )
+        title = Title.objects.create(name='Бенчмарк', year=2000)
+        review = Review.objects.create(
+            title=title, author=author, text='Бенчмарк', score=5
+        )
+        try:
+            started = time.perf_counter()
+            for idx in range(count):
+                with transaction.atomic():
+                    Comment.objects.create(
+                        review=review, author=author, text=f'Синхронно {idx}'
+                    )
+            sync_rate = count / (time.perf_counter() - started)
+
+            # Таймер не нужен: сброс по размеру пачки и финальный flush().
+            # Свой журнал не смешивает замер с комментариями сервера,
+            # ждущими сброса в общем журнале.
+            with tempfile.TemporaryDirectory() as journal_dir:
+                with override_settings(
+                    COMMENT_FLUSH_INTERVAL=3600,
+                    COMMENT_JOURNAL=Path(journal_dir) / 'comments.jsonl',
+                ):
+                    started = time.perf_counter()
+                    for idx in range(count):
+                        enqueue(review.pk, author.pk, f'Пакетно {idx}')
+                    flush()
+                    batch_rate = count / (time.perf_counter() - started)
+        finally:
+            title.delete()
+            author.delete()
+
+        self.stdout.write(
+            f'По транзакции на комментарий: {sync_rate:.0f} в секунду.'
+        )
+        self.stdout.write(
+            f'Журнал и bulk_create: {batch_rate:.0f} в секунду.'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Ускорение: {batch_rate / sync_rate:.1f}x.'
+        ))
@@ -0,0 +1,128 @@
+import csv
+import math
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from reviews.importer import SOURCES, Importer, keep_pub_dates
+from reviews.models import Review, Title
+from users.models import User
+
+PUB_DATE = '2020-01-01T00:00:00.000Z'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнение скорости загрузки отзывов из CSV: построчный '
+        'get_or_create и пакетная загрузка load_data. Все изменения '
+        'откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reviews',
+            type=int,
+            default=1_000_000,
+            help='Сколько отзывов сгенерировать для пакетной загрузки.',
+        )
+        parser.add_argument(
+            '--legacy-rows',
+            type=int,
+            default=10_000,
+            help='Сколько из них загрузить построчно для сравнения.',
+        )
+
+    def first_id(self, model):
+        return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def write(self, path, header, rows):
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    def generate(self, path, count):
+        """Файлы в формате static/data: side x side уникальных пар."""
+        side = math.ceil(math.sqrt(count))
+        category = self.first_id(Title.category.field.related_model)
+        title = self.first_id(Title)
+        user = self.first_id(User)
+        review = self.first_id(Review)
+        self.write(path / 'category.csv', ('id', 'name', 'slug'),
+                   [(category, 'Бенчмарк', f'bench-{category}')])
+        self.write(
+            path / 'users.csv',
+            ('id', 'username', 'email', 'role', 'bio', 'first_name',
+             'last_name'),
+            [(user + idx, f'bench_{user + idx}',
+              f'bench_{user + idx}@yamdb.fake', 'user', '', '', '')
+             for idx in range(side)],
+        )
+        self.write(
+            path / 'titles.csv', ('id', 'name', 'year', 'category'),
+            [(title + idx, f'Бенчмарк {idx}', 2000, category)
+             for idx in range(side)],
+        )
+        self.write(
+            path / 'review.csv',
+            ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+            ((review + idx, title + idx // side, f'Отзыв {idx}',
+              user + idx % side, idx % 10 + 1, PUB_DATE)
+             for idx in range(count)),
+        )
+
+    def load_legacy(self, path, limit):
+        """Построчная загрузка, как в прежней версии load_data."""
+        with open(path / 'review.csv', encoding='utf-8', newline='') as file:
+            for row in islice(csv.DictReader(file), limit):
+                Review.objects.get_or_create(
+                    id=row['id'],
+                    title=Title.objects.get(id=row['title_id']),
+                    author=User.objects.get(id=row['author']),
+                    score=int(row['score']),
+                    text=row['text'],
+                    pub_date=row['pub_date'],
+                )
+
+    def handle(self, *args, **options):
+        count = options['reviews']
+        legacy_rows = min(options['legacy_rows'], count)
+        parents = [source for source in SOURCES
+                   if source.name in ('category', 'users', 'titles')]
+        reviews = [source for source in SOURCES if source.name == 'review']
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory)
+            self.generate(path, count)
+            with transaction.atomic():
+                Importer(path).run(parents)
+                with transaction.atomic(), keep_pub_dates():
+                    started = time.perf_counter()
+                    self.load_legacy(path, legacy_rows)
+                    legacy_rate = legacy_rows / (
+                        time.perf_counter() - started
+                    )
+                    transaction.set_rollback(True)
+
+                started = time.perf_counter()
+                Importer(path).run(reviews)
+                elapsed = time.perf_counter() - started
+                transaction.set_rollback(True)
+
+        bulk_rate = count / elapsed
+        self.stdout.write(
+            f'Построчно: {legacy_rate:.0f} отзывов в секунду, '
+            f'{count / legacy_rate:.0f} с на {count} отзывов.'
+        )
+        self.stdout.write(
+            f'Пакетно: {bulk_rate:.0f} отзывов в секунду, '
+            f'{elapsed:.1f} с на {count} отзывов вместе с пересчётом '
+            'рейтингов.'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Ускорение: {bulk_rate / legacy_rate:.1f}x.'
+        ))
@@ -0,0 +1,82 @@
+import os
+from argparse import ArgumentTypeError
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.exporter import Exporter
+from reviews.importer import SOURCES
+
+
+def day(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ArgumentTypeError(
+            f'Дата должна быть в формате ГГГГ-ММ-ДД: {value}.'
+        )
+
+
+class Command(BaseCommand):
+    help = 'Выгрузка данных из базы в CSV файлы в формате load_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            type=Path,
+            required=True,
+            help='Каталог, в который записать CSV файлы.',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы gzip.',
+        )
+        parser.add_argument(
+            '--since',
+            type=day,
+            help='Выгрузить отзывы и комментарии не раньше этой даты.',
+        )
+        parser.add_argument(
+            '--until',
+            type=day,
+            help='Выгрузить отзывы и комментарии не позже этой даты.',
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=min(len(SOURCES), os.cpu_count() or 1),
+            help=(
+                'Сколько таблиц выгружать одновременно, по процессу на '
+                'таблицу.'
+            ),
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.DUMP_DATA_CHUNK_SIZE,
+            help='Сколько строк читать одним запросом.',
+        )
+
+    def handle(self, *args, **options):
+        if options['jobs'] < 1:
+            raise CommandError('--jobs должен быть не меньше 1.')
+        since, until = options['since'], options['until']
+        if since and until and since > until:
+            raise CommandError('--since не может быть позже --until.')
+        exporter = Exporter(
+            options['path'],
+            compress=options['gzip'],
+            since=since,
+            until=until,
+            chunk_size=options['chunk_size'],
+            jobs=options['jobs'],
+        )
+        counts = exporter.run()
+        for source in SOURCES:
+            self.stdout.write(self.style.SUCCESS(
+                f'{exporter.get_path(source).name}: выгружено строк: '
+                f'{counts[source.name]}.'
+            ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api.ingest import flush
+
+
+class Command(BaseCommand):
+    help = (
+        'Перенос комментариев из журнала отложенной записи в базу. '
+        'Запускайте после перезапуска сервера, чтобы дочитать журнал.'
+    )
+
+    def handle(self, *args, **options):
+        created = flush()
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано комментариев: {created}.'
+        ))
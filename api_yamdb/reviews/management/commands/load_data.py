@@ -1,50 +1,181 @@
-import csv
+from pathlib import Path
 
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
 
-from reviews.models import Category, Genre, Title
+from reviews.importer import (CONFLICT_MODES, SKIP, ImportConflict, Importer,
+                              ParallelImporter, StaleCheckpoint,
+                              StreamingImporter, SyncImporter)
 
 
 class Command(BaseCommand):
     help = 'Загрузка данных из CSV файлов в базу данных'
 
-    def handle(self, *args, **kwargs):
-        """Загрузка категорий."""
-        with open('static/data/category.csv', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                Category.objects.get_or_create(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug']
-                )
-        self.stdout.write(self.style.SUCCESS('category.csv загружены.'))
-
-        """Загрузка жанров."""
-        with open('static/data/genre.csv', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                Genre.objects.get_or_create(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug']
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            type=Path,
+            default=settings.CSV_DATA_DIR,
+            help='Каталог с CSV файлами.',
+        )
+        parser.add_argument(
+            '--on-conflict',
+            choices=CONFLICT_MODES,
+            default=SKIP,
+            help=(
+                'Что делать с записью, id которой уже есть в базе: '
+                'пропустить, обновить или прервать загрузку.'
+            ),
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.LOAD_DATA_BATCH_SIZE,
+            help=(
+                'Сколько строк вставлять одним запросом; в потоковом '
+                'режиме - сколько строк фиксировать одной транзакцией.'
+            ),
+        )
+        parser.add_argument(
+            '--stream',
+            action='store_true',
+            help=(
+                'Потоковая загрузка больших файлов: транзакция на каждую '
+                'пачку и контрольная точка после неё.'
+            ),
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help=(
+                'Продолжить потоковую загрузку с последней контрольной '
+                'точки каждого файла.'
+            ),
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help=(
+                'Сколько процессов разбирают файлы; независимые таблицы '
+                'загружаются одновременно.'
+            ),
+        )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help=(
+                'Записать только строки, изменившиеся с прошлой '
+                'синхронизации.'
+            ),
+        )
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help=(
+                'При --sync удалить записи, строки которых пропали из '
+                'файлов.'
+            ),
+        )
+
+    def show_progress(self, source, rows, rate):
+        self.stdout.write(
+            f'{source.filename}: {rows} строк, {rate:.0f} строк/с.'
+        )
+
+    def get_importer(self, options):
+        """Загрузчик для выбранного режима и сообщение о его остановке."""
+        streaming = options['stream'] or options['resume']
+        if options['jobs'] < 1:
+            raise CommandError('--jobs должен быть не меньше 1.')
+        if options['jobs'] > 1 and streaming:
+            raise CommandError(
+                '--jobs нельзя сочетать с --stream и --resume.'
+            )
+        if options['sync'] and (streaming or options['jobs'] > 1):
+            raise CommandError(
+                '--sync нельзя сочетать с --stream, --resume и --jobs.'
+            )
+        if options['delete'] and not options['sync']:
+            raise CommandError('--delete работает только вместе с --sync.')
+        if options['sync']:
+            importer = SyncImporter(
+                options['path'],
+                batch_size=options['batch_size'],
+                delete=options['delete'],
+            )
+            stopped = 'Синхронизация отменена.'
+        elif options['jobs'] > 1:
+            importer = ParallelImporter(
+                options['path'],
+                on_conflict=options['on_conflict'],
+                batch_size=options['batch_size'],
+                jobs=options['jobs'],
+                shard_size=settings.LOAD_DATA_SHARD_SIZE,
+                progress=self.show_progress,
+            )
+            stopped = (
+                'Загрузка остановлена, зафиксированные пачки сохранены: '
+                'повторный запуск пропустит их.'
+            )
+        elif streaming:
+            importer = StreamingImporter(
+                options['path'],
+                on_conflict=options['on_conflict'],
+                batch_size=options['batch_size'],
+                resume=options['resume'],
+                progress=self.show_progress,
+            )
+            stopped = (
+                'Загрузка остановлена, зафиксированные пачки сохранены: '
+                'продолжить можно с --resume.'
+            )
+        else:
+            importer = Importer(
+                options['path'],
+                on_conflict=options['on_conflict'],
+                batch_size=options['batch_size'],
+            )
+            stopped = 'Загрузка отменена.'
+        return importer, stopped
+
+    def handle(self, *args, **options):
+        importer, stopped = self.get_importer(options)
+        try:
+            stats = importer.run()
+        except (ImportConflict, StaleCheckpoint) as error:
+            raise CommandError(f'{error} {stopped}')
+        except IntegrityError as error:
+            raise CommandError(
+                f'Данные нарушают ограничение базы: {error}. {stopped}'
+            )
+
+        for name, counts in stats.items():
+            if counts['missing']:
+                self.stdout.write(self.style.WARNING(
+                    f'{name}.csv не найден.'
+                ))
+                continue
+            if counts['resumed']:
+                self.stdout.write(
+                    f'{name}.csv: продолжено после строки {counts["resumed"]}.'
                 )
-        self.stdout.write(self.style.SUCCESS('genre.csv загружены'))
-
-        """Загрузка произведений."""
-        with open('static/data/titles.csv', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                try:
-                    category = Category.objects.get(id=row['category'])
-                    Title.objects.get_or_create(
-                        id=row['id'],
-                        name=row['name'],
-                        year=row['year'],
-                        category=category,
-                    )
-                except Category.DoesNotExist:
-                    self.stdout.write(self.style.ERROR(
-                        f"Такой категории'{row['category']}' не существует"
-                    ))
-        self.stdout.write(self.style.SUCCESS('titles.csv загружены'))
+            if options['sync']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'{name}.csv: добавлено {counts["created"]}, '
+                    f'обновлено {counts["updated"]}, '
+                    f'удалено {counts["deleted"]}, '
+                    f'без изменений {counts["unchanged"]}.'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'{name}.csv: добавлено {counts["created"]}, '
+                    f'обновлено {counts["updated"]}, '
+                    f'пропущено {counts["skipped"]}.'
+                ))
+            if counts['orphaned']:
+                self.stdout.write(self.style.ERROR(
+                    f'{name}.csv: строк со ссылкой на несуществующую '
+                    f'запись: {counts["orphaned"]}.'
+                ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from reviews.leaderboards import rebuild_all
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестроение списков лучших произведений. Запускайте по расписанию: '
+        'между перестроениями списки считаются по старой средней оценке.'
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Перестроено списков: {count}.'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.cache import bump_table_version
+from reviews.search import FTS_TABLE, fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестроение полнотекстового индекса произведений'
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError(
+                'Полнотекстовый индекс FTS5 поддерживается только в SQLite.'
+            )
+        with transaction.atomic():
+            count = rebuild_index()
+            bump_table_version(FTS_TABLE)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано произведений: {count}.'
+        ))
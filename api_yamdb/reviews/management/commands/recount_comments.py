@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Review
+from reviews.scores import count_comments
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт счётчиков комментариев к отзывам, включая архивные'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, не исправляя их.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Сколько отзывов пересчитывать за одну транзакцию.',
+        )
+
+    def handle(self, *args, **options):
+        reviews = Review.objects.order_by('pk').values_list(
+            'pk', 'comment_count'
+        )
+        fixed = 0
+        last_pk = 0
+        while True:
+            chunk = list(reviews.filter(pk__gt=last_pk)[
+                :options['chunk_size']
+            ])
+            if not chunk:
+                break
+            last_pk = chunk[-1][0]
+            totals = count_comments([pk for pk, _ in chunk])
+            with transaction.atomic():
+                for pk, count in chunk:
+                    expected = totals[pk]
+                    if count == expected:
+                        continue
+                    self.stdout.write(self.style.WARNING(
+                        f'Отзыв {pk}: комментариев {count} -> {expected}'
+                    ))
+                    fixed += 1
+                    if not options['dry_run']:
+                        Review.objects.filter(pk=pk).update(
+                            comment_count=expected
+                        )
+
+        if not fixed:
+            self.stdout.write(self.style.SUCCESS('Расхождений не найдено.'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.ERROR(
+                f'Найдено расхождений: {fixed}.'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Исправлено отзывов: {fixed}.'
+            ))
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.scores import TITLE_COUNTER_FIELDS, count_scores, title_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт счётчиков рейтинга и гистограмм оценок по отзывам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, не исправляя их.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Сколько произведений пересчитывать одним запросом.',
+        )
+
+    def handle(self, *args, **options):
+        rows = Title.objects.order_by('pk').values_list(
+            'pk', *TITLE_COUNTER_FIELDS
+        )
+        fixed = 0
+        last_pk = 0
+        with transaction.atomic():
+            while True:
+                chunk = list(
+                    rows.filter(pk__gt=last_pk)[:options['chunk_size']]
+                )
+                if not chunk:
+                    break
+                last_pk = chunk[-1][0]
+                histograms = count_scores([row[0] for row in chunk])
+                for pk, *counters in chunk:
+                    expected = title_counters(histograms[pk])
+                    if counters == expected:
+                        continue
+                    score_sum, count, rating, *counts = counters
+                    expected_sum, expected_count, expected_rating, *_ = (
+                        expected
+                    )
+                    self.stdout.write(self.style.WARNING(
+                        f'Произведение {pk}: сумма {score_sum} -> '
+                        f'{expected_sum}, отзывов {count} -> '
+                        f'{expected_count}, рейтинг {rating} -> '
+                        f'{expected_rating}, гистограмма {counts} -> '
+                        f'{histograms[pk]}'
+                    ))
+                    fixed += 1
+                    if options['dry_run']:
+                        continue
+                    Title.objects.filter(pk=pk).update(
+                        **dict(zip(TITLE_COUNTER_FIELDS, expected))
+                    )
+
+        if not fixed:
+            self.stdout.write(self.style.SUCCESS('Расхождений не найдено.'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.ERROR(
+                f'Найдено расхождений: {fixed}.'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Исправлено произведений: {fixed}.'
+            ))
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 03:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_author_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='ingest_key',
+            field=models.CharField(editable=False, max_length=32, null=True, unique=True, verbose_name='Ключ отложенной записи'),
+        ),
+    ]
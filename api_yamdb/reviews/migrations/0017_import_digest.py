@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-18 03:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0016_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportDigest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=64, verbose_name='Файл')),
+                ('row_id', models.BigIntegerField(verbose_name='id записи')),
+                ('digest', models.BigIntegerField(verbose_name='Хэш строки')),
+            ],
+            options={
+                'verbose_name': 'Хэш строки загрузки',
+                'verbose_name_plural': 'Хэши строк загрузки',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='importdigest',
+            constraint=models.UniqueConstraint(fields=('table', 'row_id'), name='unique_import_digest_row'),
+        ),
+    ]
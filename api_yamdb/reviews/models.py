@@ -1,12 +1,18 @@
+import zlib
+
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Case, F, FloatField, When
+from django.db.models.functions import Cast
 
+from api.versioning import VersionedModel
 from users.models import User
 from .validators import validate_year
 
 
-class BaseReviewCommentModel(models.Model):
+class BaseReviewCommentModel(VersionedModel):
     text = models.TextField(verbose_name='Текст')
     author = models.ForeignKey(
         User,
@@ -50,7 +56,50 @@ class Genre(BaseCategoryGenreModel):
         verbose_name_plural = 'Жанры'
 
 
-class Title(models.Model):
+SCORES = range(settings.MIN_SCORE_REVIEW, settings.MAX_SCORE_REVIEW + 1)
+
+
+def score_count_field(score):
+    return f'score_{score}_count'
+
+
+class TitleQuerySet(models.QuerySet):
+    def update_rating(self, added=None, removed=None):
+        """Сдвигает счётчики оценок и пересчитывает рейтинг одним UPDATE.
+
+        added и removed - появившаяся и исчезнувшая оценки; при изменении
+        отзыва передаются обе.
+        """
+        score_delta = (added or 0) - (removed or 0)
+        count_delta = (added is not None) - (removed is not None)
+        histogram = {}
+        if added != removed:
+            if added is not None:
+                histogram[score_count_field(added)] = (
+                    F(score_count_field(added)) + 1
+                )
+            if removed is not None:
+                histogram[score_count_field(removed)] = (
+                    F(score_count_field(removed)) - 1
+                )
+        score_sum = F('score_sum') + score_delta
+        review_count = F('review_count') + count_delta
+        return self.update(
+            **histogram,
+            score_sum=score_sum,
+            review_count=review_count,
+            rating=Case(
+                When(
+                    review_count__gt=-count_delta,
+                    then=Cast(score_sum, FloatField()) / review_count,
+                ),
+                default=None,
+                output_field=FloatField(),
+            ),
+        )
+
+
+class Title(VersionedModel):
     name = models.CharField('Имя', max_length=256)
     year = models.PositiveIntegerField('Год', validators=[validate_year])
     description = models.TextField('Описание', blank=True, null=True)
@@ -65,13 +114,46 @@ class Title(models.Model):
         verbose_name='Жанр',
         related_name='titles',
     )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False
+    )
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов', default=0, editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг', null=True, blank=True, editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
+    @property
+    def score_counts(self):
+        """Количество отзывов с каждой оценкой, от низшей к высшей."""
+        return [getattr(self, score_count_field(score)) for score in SCORES]
+
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=('rating', 'id'), name='title_rating_id_idx'),
+            models.Index(
+                fields=('category', 'year', 'rating', 'id'),
+                name='title_category_year_idx',
+            ),
+            models.Index(
+                fields=('year', 'rating', 'id'), name='title_year_rating_idx'
+            ),
+            models.Index(fields=('name',), name='title_name_idx'),
+        ]
+
+
+for score in SCORES:
+    Title.add_to_class(score_count_field(score), models.PositiveIntegerField(
+        f'Отзывов с оценкой {score}', default=0, editable=False
+    ))
 
 
 class Review(BaseReviewCommentModel):
@@ -88,6 +170,15 @@ class Review(BaseReviewCommentModel):
             MaxValueValidator(10, message='Оценка не может быть выше 10')
         ]
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
 
     class Meta:
         constraints = [
@@ -96,7 +187,17 @@ class Review(BaseReviewCommentModel):
         ]
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date', 'id'),
+                name='review_author_pub_date_idx',
+            ),
+        ]
 
 
 class Comment(BaseReviewCommentModel):
@@ -104,8 +205,122 @@ class Comment(BaseReviewCommentModel):
         Review, on_delete=models.CASCADE,
         verbose_name='Отзыв', related_name='comments'
     )
+    ingest_key = models.CharField(
+        'Ключ отложенной записи', max_length=32,
+        unique=True, null=True, editable=False,
+    )
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date', 'id'),
+                name='comment_author_pub_date_idx',
+            ),
+        ]
+
+
+class ArchivedComment(models.Model):
+    """Старый комментарий, перенесённый из Comment со сжатым текстом."""
+    review = models.ForeignKey(
+        Review, on_delete=models.CASCADE,
+        verbose_name='Отзыв', related_name='archived_comments'
+    )
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        verbose_name='Автор', related_name='archived_comments'
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+    compressed_text = models.BinaryField('Текст, сжатый zlib')
+
+    class Meta:
+        verbose_name = 'Архивный комментарий'
+        verbose_name_plural = 'Архивные комментарии'
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='archived_review_pub_date_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.text[:settings.SNIPPET_LENGTH]
+
+    @property
+    def text(self):
+        return zlib.decompress(self.compressed_text).decode()
+
+    @classmethod
+    def from_comment(cls, comment):
+        return cls(
+            id=comment.id,
+            review_id=comment.review_id,
+            author_id=comment.author_id,
+            pub_date=comment.pub_date,
+            compressed_text=zlib.compress(comment.text.encode(), 9),
+        )
+
+
+class IdempotencyKey(models.Model):
+    """Ответ на POST-запрос, сохранённый по заголовку Idempotency-Key."""
+    scope = models.CharField('Пользователь', max_length=64, blank=True)
+    key = models.CharField('Ключ', max_length=255)
+    fingerprint = models.CharField('Хэш запроса', max_length=64)
+    status_code = models.PositiveSmallIntegerField('Статус ответа', null=True)
+    response_data = models.JSONField(
+        'Тело ответа', null=True, encoder=DjangoJSONEncoder
+    )
+    created = models.DateTimeField('Создан', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Ключ идемпотентности'
+        verbose_name_plural = 'Ключи идемпотентности'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('scope', 'key'), name='unique_idempotency_scope_key'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=('created',), name='idempotency_created_idx'),
+        ]
+
+
+class ImportCheckpoint(models.Model):
+    """Докуда потоковая загрузка успела зафиксировать CSV-файл."""
+    path = models.CharField('Файл', max_length=1024, unique=True)
+    offset = models.PositiveBigIntegerField('Смещение в байтах', default=0)
+    rows = models.PositiveBigIntegerField('Загружено строк', default=0)
+    updated = models.DateTimeField('Обновлена', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Контрольная точка загрузки'
+        verbose_name_plural = 'Контрольные точки загрузки'
+
+    def __str__(self):
+        return f'{self.path}: {self.rows}'
+
+
+class ImportDigest(models.Model):
+    """Хэш строки CSV, с которой запись последний раз синхронизирована."""
+    table = models.CharField('Файл', max_length=64)
+    row_id = models.BigIntegerField('id записи')
+    digest = models.BigIntegerField('Хэш строки')
+
+    class Meta:
+        verbose_name = 'Хэш строки загрузки'
+        verbose_name_plural = 'Хэши строк загрузки'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('table', 'row_id'), name='unique_import_digest_row'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.table}: {self.row_id}'
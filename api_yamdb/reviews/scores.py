@@ -0,0 +1,95 @@
+from collections import Counter
+from itertools import accumulate
+
+from django.conf import settings
+from django.db.models import Count
+
+from reviews.models import (SCORES, ArchivedComment, Comment, Review,
+                            score_count_field)
+
+TITLE_COUNTER_FIELDS = ['score_sum', 'review_count', 'rating'] + [
+    score_count_field(score) for score in SCORES
+]
+
+
+def score_at(cumulative, position):
+    """Оценка, стоящая на месте position среди отсортированных оценок."""
+    for score, total in zip(SCORES, cumulative):
+        if total > position:
+            return score
+    return SCORES[-1]
+
+
+def percentile(cumulative, percent):
+    """Процентиль с линейной интерполяцией, как numpy.percentile."""
+    position = (cumulative[-1] - 1) * percent / 100
+    lower = int(position)
+    low = score_at(cumulative, lower)
+    if position == lower:
+        return float(low)
+    high = score_at(cumulative, lower + 1)
+    return low + (high - low) * (position - lower)
+
+
+def score_summary(counts):
+    """Распределение оценок, медиана и процентили по счётчикам оценок."""
+    cumulative = list(accumulate(counts))
+    summary = {
+        'distribution': {
+            str(score): count for score, count in zip(SCORES, counts)
+        },
+        'median': None,
+        'percentiles': {
+            str(percent): None for percent in settings.SCORE_PERCENTILES
+        },
+    }
+    if cumulative[-1]:
+        summary['median'] = percentile(cumulative, 50)
+        for percent in settings.SCORE_PERCENTILES:
+            summary['percentiles'][str(percent)] = percentile(
+                cumulative, percent
+            )
+    return summary
+
+
+def count_scores(title_ids):
+    """Гистограммы оценок для пачки произведений одним GROUP BY.
+
+    Возвращает словарь id -> список счётчиков; произведения без отзывов
+    получают нулевые счётчики.
+    """
+    histograms = {pk: [0] * len(SCORES) for pk in title_ids}
+    rows = Review.objects.filter(title_id__in=histograms).values_list(
+        'title_id', 'score'
+    ).annotate(total=Count('id')).order_by()
+    for title_id, score, total in rows:
+        histograms[title_id][score - SCORES[0]] = total
+    return histograms
+
+
+def count_comments(review_ids):
+    """Число живых и архивных комментариев пачки отзывов.
+
+    Возвращает Counter id -> количество; отзывов без комментариев в нём
+    нет, и для них он отдаёт 0.
+    """
+    totals = Counter()
+    for model in (Comment, ArchivedComment):
+        totals.update(dict(model.objects.filter(
+            review_id__in=review_ids
+        ).values_list('review_id').annotate(
+            total=Count('id')
+        ).order_by()))
+    return totals
+
+
+def title_counters(counts):
+    """Значения TITLE_COUNTER_FIELDS произведения по гистограмме оценок."""
+    review_count = sum(counts)
+    score_sum = sum(score * total for score, total in zip(SCORES, counts))
+    return [
+        score_sum,
+        review_count,
+        score_sum / review_count if review_count else None,
+        *counts,
+    ]
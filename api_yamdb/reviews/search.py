@@ -0,0 +1,96 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+FTS_TABLE = 'reviews_title_fts'
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def to_match_query(text):
+    """Переводит пользовательский ввод в безопасный запрос FTS5.
+
+    Каждое слово ищется как префикс, слова объединяются через AND.
+    """
+    return ' '.join(
+        f'"{token}"*' for token in TOKEN_PATTERN.findall(text.lower())
+    )
+
+
+def index_title(title, created=False):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        if not created:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [title.pk]
+            )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            'VALUES (%s, %s, %s)',
+            [title.pk, title.name, title.description or ''],
+        )
+
+
+def unindex_title(pk):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [pk])
+
+
+def reindex_titles(pks):
+    """Переиндексирует пачку произведений двумя запросами."""
+    if not fts_available() or not pks:
+        return
+    placeholders = ', '.join(['%s'] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', pks
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            "SELECT id, name, COALESCE(description, '') FROM reviews_title "
+            f'WHERE id IN ({placeholders})',
+            pks,
+        )
+
+
+def rebuild_index():
+    """Перестраивает индекс целиком и возвращает число записей в нём."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            "SELECT id, name, COALESCE(description, '') FROM reviews_title"
+        )
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) "
+                       "VALUES ('optimize')")
+        cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def search_titles(queryset, text):
+    """Оставляет в выборке найденные произведения в порядке BM25."""
+    match = to_match_query(text)
+    if not match:
+        return queryset.none()
+    if not fts_available():
+        for token in TOKEN_PATTERN.findall(text):
+            queryset = queryset.filter(
+                Q(name__icontains=token) | Q(description__icontains=token)
+            )
+        return queryset
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = reviews_title.id',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[match],
+        select={'search_rank': f'bm25({FTS_TABLE}, 10.0, 1.0)'},
+    ).order_by('search_rank', 'id')
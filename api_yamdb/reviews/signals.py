@@ -0,0 +1,92 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (m2m_changed, post_delete,
+                                      post_migrate, post_save)
+from django.dispatch import receiver
+
+from reviews.leaderboards import clear_all, refresh_title
+from reviews.models import ArchivedComment, Comment, Review, Title
+from reviews.search import index_title, unindex_title
+
+
+def refresh_leaderboards(title_id):
+    transaction.on_commit(lambda: refresh_title(title_id))
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    """Поддерживает счётчики рейтинга произведения при записи отзыва."""
+    if raw:
+        return
+    titles = Title.objects.filter(pk=instance.title_id)
+    if created:
+        titles.update_rating(added=instance.score)
+        refresh_leaderboards(instance.title_id)
+    else:
+        old_score = getattr(instance, '_loaded_score', None)
+        if old_score is None:
+            old_score = instance.score
+        if instance.score != old_score:
+            titles.update_rating(added=instance.score, removed=old_score)
+            refresh_leaderboards(instance.title_id)
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Вычитает оценку удалённого отзыва, в том числе при каскаде."""
+    Title.objects.filter(pk=instance.title_id).update_rating(
+        removed=instance.score
+    )
+    refresh_leaderboards(instance.title_id)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Review.objects.filter(pk=instance.review_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=ArchivedComment)
+def comment_deleted(sender, instance, **kwargs):
+    """Вычитает удалённый комментарий, в том числе при каскаде."""
+    Review.objects.filter(
+        pk=instance.review_id, comment_count__gt=0
+    ).update(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Обновляет полнотекстовый индекс и списки лучших по категории."""
+    if update_fields is None or {'name', 'description'} & set(update_fields):
+        index_title(instance, created)
+    if not created and (update_fields is None or 'category' in update_fields):
+        refresh_leaderboards(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    unindex_title(instance.pk)
+    refresh_leaderboards(instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        refresh_leaderboards(instance.pk)
+    elif pk_set:
+        for title_id in pk_set:
+            refresh_leaderboards(title_id)
+
+
+@receiver(post_migrate)
+def tables_migrated(sender, **kwargs):
+    """После migrate/flush списки лучших могли устареть без сигналов."""
+    if sender.name == 'reviews':
+        clear_all()
@@ -3,9 +3,10 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 
 from api.validators import username_validator
+from api.versioning import VersionedModel
 
 
-class User(AbstractUser):
+class User(VersionedModel, AbstractUser):
     ADMIN = 'admin'
     MODERATOR = 'moderator'
     USER = 'user'
@@ -0,0 +1,11 @@
+import shutil
+
+import pytest
+from django.conf import settings
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    path = tmp_path / 'data'
+    shutil.copytree(settings.CSV_DATA_DIR, path)
+    return path
@@ -0,0 +1,120 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08RatingCounters:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_title(self, title_id):
+        from reviews.models import Title
+        return Title.objects.get(pk=title_id)
+
+    def test_01_counters_follow_review_writes(self, admin_client, admin,
+                                              user, user_client, moderator,
+                                              moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.review_count) == (10, 2), (
+            'Проверьте, что при создании отзыва счётчики `score_sum` и '
+            '`review_count` произведения увеличиваются.'
+        )
+        assert title.rating == 5
+
+        create_single_review(moderator_client, title_id, 'Шедевр', 8)
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 2}
+        )
+        assert response.status_code == HTTPStatus.OK
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.review_count) == (15, 3), (
+            'Проверьте, что при изменении оценки счётчик `score_sum` '
+            'сдвигается на разницу оценок.'
+        )
+        assert title.rating == 5
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.review_count) == (10, 2)
+
+        moderator.delete()
+        user.delete()
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.review_count) == (0, 0), (
+            'Проверьте, что каскадное удаление отзывов вместе с автором '
+            'уменьшает счётчики произведения.'
+        )
+        assert title.rating is None
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.json().get('rating') is None
+
+    def test_02_recount_ratings_fixes_drift(self, admin_client, admin,
+                                            user, user_client):
+        from reviews.models import Title
+
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+        }
+        _, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        Title.objects.filter(pk=title_id).update(
+            score_sum=1, review_count=7, rating=None
+        )
+
+        call_command('recount_ratings', '--dry-run')
+        assert self.get_title(title_id).score_sum == 1, (
+            'Проверьте, что `recount_ratings --dry-run` не изменяет данные.'
+        )
+
+        call_command('recount_ratings')
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.review_count) == (10, 2), (
+            'Проверьте, что `recount_ratings` восстанавливает счётчики '
+            'рейтинга по отзывам.'
+        )
+        assert title.rating == 5
+
+    def test_03_recount_ratings_fixes_rating_only(self, admin_client, admin,
+                                                  user, user_client):
+        from reviews.models import Title
+
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+        }
+        _, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        Title.objects.filter(pk=title_id).update(rating=1)
+
+        output = StringIO()
+        call_command('recount_ratings', stdout=output)
+        assert 'Расхождений не найдено' not in output.getvalue(), (
+            'Проверьте, что `recount_ratings` сверяет и поле `rating`.'
+        )
+        assert self.get_title(title_id).rating == 5
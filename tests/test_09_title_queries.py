@@ -0,0 +1,85 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    LIST_QUERIES = 3
+    DETAIL_QUERIES = 2
+    CREATE_QUERIES = 10
+    UPDATE_QUERIES = 14
+
+    def create_catalog(self, title_count, genre_count):
+        from reviews.models import Category, Genre, Title
+
+        category = Category.objects.create(name='Фильмы', slug='movies')
+        genres = [
+            Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(genre_count)
+        ]
+        for idx in range(title_count):
+            title = Title.objects.create(
+                name=f'Фильм {idx}', year=2000, category=category
+            )
+            title.genre.set(genres)
+        return genres
+
+    @pytest.mark.parametrize('title_count,genre_count', [(2, 1), (10, 5)])
+    def test_01_list_and_detail_budget(self, client, title_count,
+                                       genre_count,
+                                       django_assert_max_num_queries):
+        self.create_catalog(title_count, genre_count)
+
+        with django_assert_max_num_queries(self.LIST_QUERIES):
+            response = client.get(self.TITLES_URL)
+        results = response.json()['results']
+        assert len(results) == title_count
+        assert all(len(title['genre']) == genre_count for title in results)
+
+        with django_assert_max_num_queries(self.DETAIL_QUERIES):
+            client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(
+                    title_id=results[0]['id']
+                )
+            )
+
+    @pytest.mark.parametrize('genre_count', [1, 6])
+    def test_02_create_and_update_budget(self, admin_client, genre_count,
+                                         django_assert_max_num_queries):
+        titles, categories, _ = create_titles(admin_client)
+        genres = self.create_catalog(0, genre_count)
+        slugs = [genre.slug for genre in genres]
+
+        with django_assert_max_num_queries(self.CREATE_QUERIES):
+            response = admin_client.post(self.TITLES_URL, data={
+                'name': 'Новый фильм',
+                'year': 2001,
+                'category': categories[0]['slug'],
+                'genre': slugs,
+            })
+        assert response.json()['genre'] == slugs
+
+        with django_assert_max_num_queries(self.UPDATE_QUERIES):
+            response = admin_client.patch(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0]['id']
+                ),
+                data={'genre': slugs}
+            )
+        assert response.json()['genre'] == slugs
+
+    def test_03_unknown_genre_slug(self, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Новый фильм',
+            'year': 2001,
+            'category': categories[0]['slug'],
+            'genre': [genres[0]['slug'], 'unknown'],
+        })
+        assert response.status_code == 400
+        assert 'genre' in response.json()
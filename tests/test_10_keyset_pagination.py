@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10KeysetPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    USERS_URL = '/api/v1/users/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def walk(self, client, url):
+        response = client.get(url, {'cursor': ''})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data
+        assert data['previous'] is None
+        pages = [data]
+        while data['next']:
+            data = client.get(data['next']).json()
+            pages.append(data)
+        return pages
+
+    def walk_back(self, client, last_page):
+        pages = [last_page]
+        data = last_page
+        while data['previous']:
+            data = client.get(data['previous']).json()
+            pages.append(data)
+        return pages[::-1]
+
+    def flatten(self, pages, key):
+        return [item[key] for page in pages for item in page['results']]
+
+    def test_01_titles_with_equal_and_missing_ratings(self, client,
+                                                      django_user_model):
+        from reviews.models import Review, Title
+
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            for idx in range(2)
+        ]
+        scores = [None, 7, None, 3, 7, 10, None, 7, 3, 5, None, 7, 1]
+        for idx, score in enumerate(scores):
+            title = Title.objects.create(name=f'Title {idx}', year=2000)
+            if score is not None:
+                for author in authors:
+                    Review.objects.create(
+                        title=title, author=author, text='text', score=score
+                    )
+
+        expected = self.flatten(
+            [client.get(self.TITLES_URL, {'page': page}).json()
+             for page in (1, 2)],
+            'id'
+        )
+        pages = self.walk(client, self.TITLES_URL)
+        assert len(pages) == 2
+        assert self.flatten(pages, 'id') == expected, (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` отдаёт '
+            'произведения в порядке рейтинга и id без пропусков и повторов.'
+        )
+        assert self.flatten(self.walk_back(client, pages[-1]), 'id') == (
+            expected
+        )
+
+    def test_02_reviews_keyset(self, client, django_user_model):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Title', year=2000)
+        for idx in range(23):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text=f'review {idx}', score=5
+            )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        pages = self.walk(client, url)
+        ids = self.flatten(pages, 'id')
+        assert ids == sorted(ids, reverse=True)
+        assert len(ids) == 23
+        assert self.flatten(self.walk_back(client, pages[-1]), 'id') == ids
+
+    def test_03_users_keyset(self, admin_client, django_user_model):
+        for idx in range(15):
+            django_user_model.objects.create_user(
+                username=f'user{idx:02}', email=f'user{idx}@yamdb.fake'
+            )
+        usernames = self.flatten(
+            self.walk(admin_client, self.USERS_URL), 'username'
+        )
+        assert usernames == sorted(
+            django_user_model.objects.values_list('username', flat=True)
+        )
+
+    def test_04_default_pagination_unchanged(self, client):
+        response = client.get(self.TITLES_URL)
+        assert set(response.json()) == {
+            'count', 'next', 'previous', 'results'
+        }
+
+    def test_05_invalid_cursor(self, client):
+        response = client.get(self.TITLES_URL, {'cursor': 'garbage'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_categories
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CountPagination:
+
+    CATEGORY_URL = '/api/v1/categories/'
+    TITLES_URL = '/api/v1/titles/'
+
+    def count_queries(self, client, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK
+        count_sql = [
+            query['sql'] for query in context.captured_queries
+            if 'COUNT(' in query['sql']
+        ]
+        return response.json(), len(count_sql)
+
+    def create_titles(self, amount):
+        from reviews.models import Title
+
+        for idx in range(amount):
+            Title.objects.create(name=f'Title {idx}', year=2000 + idx % 3)
+
+    def test_01_cached_count_is_invalidated_on_write(self, client,
+                                                     admin_client):
+        create_categories(admin_client)
+        data, counted = self.count_queries(client, self.CATEGORY_URL)
+        assert data['count'] == 2 and counted == 1
+
+        data, counted = self.count_queries(client, self.CATEGORY_URL)
+        assert data['count'] == 2 and counted == 0, (
+            'Проверьте, что повторный запрос списка берёт `count` из кэша.'
+        )
+
+        admin_client.post(
+            self.CATEGORY_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        data, counted = self.count_queries(client, self.CATEGORY_URL)
+        assert data['count'] == 3 and counted == 1, (
+            'Проверьте, что запись в таблицу сбрасывает закэшированный '
+            '`count`.'
+        )
+
+    def test_02_cached_count_per_filter(self, client):
+        self.create_titles(12)
+        data, _ = self.count_queries(client, self.TITLES_URL, {'year': 2000})
+        assert data['count'] == 4
+        data, _ = self.count_queries(client, self.TITLES_URL, {'year': 2001})
+        assert data['count'] == 4
+        data, _ = self.count_queries(client, self.TITLES_URL)
+        assert data['count'] == 12
+
+    def test_03_countless_mode(self, client):
+        self.create_titles(23)
+        data, counted = self.count_queries(
+            client, self.TITLES_URL, {'count': 'none'}
+        )
+        assert data['count'] is None and counted == 0
+        seen = [title['id'] for title in data['results']]
+        while data['next']:
+            assert 'count=none' in data['next']
+            data = client.get(data['next']).json()
+            seen.extend(title['id'] for title in data['results'])
+        assert len(seen) == len(set(seen)) == 23
+        assert data['previous']
+
+        response = client.get(self.TITLES_URL, {'count': 'none', 'page': 4})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_estimated_count(self, client):
+        self.create_titles(5)
+        data, _ = self.count_queries(
+            client, self.TITLES_URL, {'count': 'estimate'}
+        )
+        assert data['count'] == 5
+        assert data['next'] is None
+
+    @pytest.mark.skipif(
+        connection.vendor != 'postgresql',
+        reason='Оценка по плану есть только в PostgreSQL'
+    )
+    def test_05_estimated_count_from_plan(self, client):
+        self.create_titles(5)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE reviews_title')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL, {'count': 'estimate'})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `?count=estimate` работает на PostgreSQL.'
+        )
+        assert isinstance(response.json()['count'], int)
+        assert any(
+            query['sql'].startswith('EXPLAIN (FORMAT JSON)')
+            for query in context.captured_queries
+        )
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), 'Проверьте, что оценка не выполняет COUNT(*).'
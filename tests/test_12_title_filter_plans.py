@@ -0,0 +1,77 @@
+import re
+from itertools import combinations
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?\w+$')
+FILTERS = {
+    'category': 'films',
+    'genre': 'drama',
+    'name': 'Терминатор',
+    'year': 1984,
+}
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='EXPLAIN QUERY PLAN есть только в SQLite'
+)
+@pytest.mark.django_db(transaction=True)
+class Test12TitleFilterPlans:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def query_plans(self, client, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            client.get(url, params)
+        plans = []
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                if not query['sql'].startswith('SELECT'):
+                    continue
+                cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+                plans.append(
+                    (query['sql'], [row[-1] for row in cursor.fetchall()])
+                )
+        return plans
+
+    def assert_no_full_scan(self, plans, description):
+        for sql, plan in plans:
+            scans = [
+                step for step in plan
+                if FULL_SCAN.match(step)
+                or (step.startswith('SCAN') and 'reviews_title' in step)
+            ]
+            assert not scans, (
+                f'{description}: запрос выполняет полный просмотр таблицы.\n'
+                f'{sql}\n' + '\n'.join(plan)
+            )
+
+    @pytest.mark.parametrize('combo', [
+        combo
+        for size in range(1, len(FILTERS) + 1)
+        for combo in combinations(FILTERS, size)
+    ], ids=lambda combo: '+'.join(combo))
+    def test_01_title_filters_use_indexes(self, client, combo):
+        params = {name: FILTERS[name] for name in combo}
+        self.assert_no_full_scan(
+            self.query_plans(client, self.TITLES_URL, params),
+            f'Фильтрация произведений по {params}'
+        )
+
+    def test_02_reviews_list_uses_index(self, client, user):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Терминатор', year=1984)
+        Review.objects.create(title=title, author=user, text='text', score=5)
+        plans = self.query_plans(
+            client, self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        )
+        self.assert_no_full_scan(plans, 'Список отзывов произведения')
+        assert any(
+            'review_title_pub_date_idx' in step
+            for _, plan in plans for step in plan
+        )
@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from tests.utils import create_titles
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='Индекс FTS5 есть только в SQLite'
+)
+@pytest.mark.django_db(transaction=True)
+class Test13TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def search(self, client, text, **params):
+        response = client.get(self.TITLES_URL, {'search': text, **params})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_by_name_and_description(self, client, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Терминатор 2',
+            'year': 1991,
+            'genre': titles[0]['genre'],
+            'category': categories[0]['slug'],
+            'description': 'Судный день',
+        })
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': titles[0]['genre'],
+            'category': categories[0]['slug'],
+            'description': 'Не Терминатор, но тоже классика',
+        })
+
+        found = self.search(client, 'терминатор')
+        assert set(found) == {'Терминатор', 'Терминатор 2', 'Чужой'}, (
+            'Проверьте, что параметр `search` ищет по названию и описанию '
+            'произведения без учёта регистра.'
+        )
+        assert found[-1] == 'Чужой', (
+            'Проверьте, что совпадения в названии ранжируются выше '
+            'совпадений в описании.'
+        )
+        assert self.search(client, 'термин суд') == ['Терминатор 2']
+        assert self.search(client, 'орешек') == ['Крепкий орешек']
+        assert self.search(client, '"*)(') == []
+        assert self.search(client, 'терминатор', year=1991) == [
+            'Терминатор 2'
+        ]
+
+    def test_02_index_follows_title_writes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id']),
+            data={'name': 'Крепкий орешек 2'}
+        )
+        assert self.search(client, 'орешек 2') == ['Крепкий орешек 2']
+
+        admin_client.delete(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        )
+        assert self.search(client, 'терминатор') == []
+
+    def test_03_rebuild_search_index(self, client, admin_client):
+        create_titles(admin_client)
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM reviews_title_fts')
+        assert self.search(client, 'терминатор') == []
+
+        call_command('rebuild_search_index')
+        assert self.search(client, 'терминатор') == ['Терминатор']
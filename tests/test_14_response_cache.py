@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_categories, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ResponseCache:
+
+    CATEGORY_URL = '/api/v1/categories/'
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    STATS_URL = '/api/v1/cache/stats/'
+
+    def test_01_anonymous_get_is_cached(self, client, admin_client,
+                                        django_assert_num_queries):
+        create_categories(admin_client)
+        response = client.get(self.CATEGORY_URL)
+        assert response['X-Cache'] == 'MISS'
+
+        with django_assert_num_queries(0):
+            cached = client.get(self.CATEGORY_URL)
+        assert cached['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный анонимный GET-запрос к '
+            f'`{self.CATEGORY_URL}` отдаётся из кэша.'
+        )
+        assert cached.json() == response.json()
+
+        response = admin_client.get(self.CATEGORY_URL)
+        assert 'X-Cache' not in response
+
+    def test_02_query_string_is_normalized(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(self.TITLES_URL + '?year=1984&name=Терминатор')
+        assert response['X-Cache'] == 'MISS'
+        response = client.get(self.TITLES_URL + '?name=Терминатор&year=1984')
+        assert response['X-Cache'] == 'HIT'
+
+    def test_03_writes_invalidate_cache(self, client, admin_client,
+                                        user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert client.get(url).json()['rating'] is None
+        assert client.get(url)['X-Cache'] == 'HIT'
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 8)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 8, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведения.'
+        )
+
+        client.get(self.CATEGORY_URL)
+        admin_client.post(
+            self.CATEGORY_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        response = client.get(self.CATEGORY_URL)
+        assert response['X-Cache'] == 'MISS'
+        assert 'music' in [item['slug'] for item in response.json()['results']]
+
+    def test_04_cache_stats(self, client, admin_client):
+        stats = admin_client.get(self.STATS_URL).json()
+        client.get(self.CATEGORY_URL)
+        client.get(self.CATEGORY_URL)
+        new_stats = admin_client.get(self.STATS_URL).json()
+        assert new_stats['hits'] == stats['hits'] + 1
+        assert new_stats['misses'] == stats['misses'] + 1
+        assert client.get(self.STATS_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
@@ -0,0 +1,139 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+    USERS_URL = '/api/v1/users/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def assert_not_modified(self, client, url, response, queries,
+                            django_assert_num_queries):
+        etag = response['ETag']
+        assert etag.startswith('"'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'сильный ETag.'
+        )
+        assert response['Last-Modified']
+        with django_assert_num_queries(queries):
+            not_modified = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+        assert not_modified['ETag'] == etag
+        not_modified = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_01_list_and_detail_routes(self, client, admin_client, admin,
+                                       user, user_client,
+                                       django_assert_num_queries):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_id = titles[0]['id']
+        # Ответ 304 проверяет только существование объекта и родителя.
+        urls = (
+            (self.TITLES_URL, 0),
+            (self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title_id), 1),
+            (self.REVIEWS_URL_TEMPLATE.format(title_id=title_id), 1),
+            (self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            ), 2),
+            (self.COMMENTS_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            ), 1),
+        )
+        for url, queries in urls:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            self.assert_not_modified(
+                client, url, response, queries, django_assert_num_queries
+            )
+
+    def test_02_writes_change_etag(self, client, admin_client, admin, user,
+                                   user_client, moderator_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        other_reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[1]['id']
+        )
+        etag = client.get(reviews_url)['ETag']
+        other_etag = client.get(other_reviews_url)['ETag']
+
+        create_single_review(moderator_client, titles[0]['id'], 'Текст', 3)
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет ETag списка отзывов.'
+        )
+        assert response['ETag'] != etag
+
+        response = client.get(other_reviews_url, HTTP_IF_NONE_MATCH=other_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что отзыв к одному произведению не меняет ETag '
+            'отзывов к другому.'
+        )
+
+        title_url = self.TITLES_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        etag = client.get(title_url)['ETag']
+        admin_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id']
+            ),
+            data={'score': 10}
+        )
+        response = client.get(title_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_checks_permissions_and_routes(self, client, admin_client,
+                                              admin, user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        etag = admin_client.get(self.USERS_URL)['ETag']
+        response = client.get(self.USERS_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что условный запрос не обходит проверку прав.'
+        )
+        response = user_client.get(self.USERS_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        etag = client.get(url)['ETag']
+        wrong_title_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[1]['id'], review_id=reviews[0]['id']
+        )
+        response = client.get(wrong_title_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что отзыв под чужим произведением отвечает 404 и на '
+            'условный запрос.'
+        )
+
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[1]['id']
+        )
+        etag = client.get(reviews_url)['ETag']
+        admin_client.delete(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id'])
+        )
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что отзывы удалённого произведения отвечают 404 и на '
+            'условный запрос.'
+        )
@@ -0,0 +1,142 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Leaderboards:
+
+    TOP_URL = '/api/v1/titles/top/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def create_users(self, amount):
+        from users.models import User
+
+        return [
+            User.objects.create(
+                username=f'critic{idx}', email=f'critic{idx}@yamdb.fake'
+            )
+            for idx in range(amount)
+        ]
+
+    def create_title(self, name, category=None, genres=()):
+        from reviews.models import Title
+
+        title = Title.objects.create(name=name, year=2000, category=category)
+        title.genre.set(genres)
+        return title
+
+    def review(self, title, author, score):
+        from reviews.models import Review
+
+        return Review.objects.create(
+            title=title, author=author, text='Отзыв', score=score
+        )
+
+    def top(self, client, **params):
+        response = client.get(self.TOP_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TOP_URL}` возвращает '
+            'статус 200.'
+        )
+        return [title['name'] for title in response.json()]
+
+    def test_01_bayesian_ranking(self, client):
+        users = self.create_users(20)
+        single = self.create_title('Одна десятка')
+        popular = self.create_title('Много девяток')
+        average = self.create_title('Середнячок')
+        self.create_title('Без отзывов')
+        self.review(single, users[0], 10)
+        for author in users:
+            self.review(popular, author, 9)
+            self.review(average, author, 5)
+
+        response = client.get(self.TOP_URL)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['name'] for title in data] == [
+            'Много девяток', 'Одна десятка', 'Середнячок'
+        ], (
+            'Проверьте, что произведение с единственной высокой оценкой '
+            'ранжируется ниже произведения с множеством оценок чуть ниже, '
+            'а произведения без отзывов в список не попадают.'
+        )
+        assert data[0]['rating'] == 9
+        assert 7 < data[1]['bayesian_rating'] < data[0]['bayesian_rating']
+        assert self.top(client, limit=1) == ['Много девяток']
+
+    def test_02_category_and_genre_boards(self, client):
+        from reviews.models import Category, Genre
+
+        films = Category.objects.create(name='Фильмы', slug='films')
+        books = Category.objects.create(name='Книги', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        users = self.create_users(3)
+        film = self.create_title('Фильм', films, [drama])
+        book = self.create_title('Книга', books)
+        self.review(film, users[0], 4)
+        self.review(book, users[0], 8)
+
+        assert self.top(client) == ['Книга', 'Фильм']
+        assert self.top(client, category='films') == ['Фильм']
+        assert self.top(client, genre='drama') == ['Фильм']
+        response = client.get(self.TOP_URL, {'category': 'unknown'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+        film.genre.clear()
+        assert self.top(client, genre='drama') == [], (
+            'Проверьте, что смена жанров произведения обновляет списки '
+            'лучших по жанрам.'
+        )
+        film.refresh_from_db()
+        film.category = books
+        film.save()
+        assert self.top(client, category='films') == []
+        assert self.top(client, category='books') == ['Книга', 'Фильм']
+
+    def test_03_incremental_update(self, client, user_client,
+                                   django_assert_max_num_queries):
+        users = self.create_users(2)
+        first = self.create_title('Первое')
+        second = self.create_title('Второе')
+        for author in users:
+            self.review(first, author, 7)
+        self.review(second, users[0], 6)
+        assert self.top(client) == ['Первое', 'Второе']
+
+        response = user_client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=second.id),
+            data={'text': 'Лучшее', 'score': 10}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        with django_assert_max_num_queries(2):
+            top = self.top(client)
+        assert top == ['Второе', 'Первое'], (
+            'Проверьте, что новый отзыв сразу обновляет список лучших без '
+            'полного пересчёта.'
+        )
+
+        second.delete()
+        assert self.top(client) == ['Первое']
+
+    @override_settings(LEADERBOARD_SIZE=2)
+    def test_04_stale_board_is_rebuilt(self, client):
+        from reviews.models import Review
+
+        users = self.create_users(2)
+        titles = [self.create_title(f'Произведение {idx}') for idx in range(6)]
+        for idx, title in enumerate(titles):
+            self.review(title, users[0], idx + 1)
+        assert self.top(client) == ['Произведение 5', 'Произведение 4']
+
+        Review.objects.filter(score__gte=2).delete()
+        assert self.top(client) == ['Произведение 0'], (
+            'Проверьте, что опустевший список лучших строится заново.'
+        )
+
+        self.review(titles[3], users[1], 9)
+        call_command('rebuild_leaderboards')
+        assert self.top(client) == ['Произведение 3', 'Произведение 0']
@@ -0,0 +1,115 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ScoreHistogram:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_scores(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert 'scores' in response.json(), (
+            'Проверьте, что ответ на GET-запрос к странице произведения '
+            'содержит поле `scores`.'
+        )
+        return response.json()['scores']
+
+    def test_01_histogram_follows_review_writes(self, client, admin_client,
+                                                user_client, moderator_client,
+                                                django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        scores = self.get_scores(client, title_id)
+        assert set(scores['distribution'].values()) == {0}
+        assert scores['median'] is None
+
+        review = create_single_review(
+            admin_client, title_id, 'Плохо', 2
+        ).json()
+        create_single_review(user_client, title_id, 'Так себе', 4)
+        create_single_review(moderator_client, title_id, 'Отлично', 9)
+        with django_assert_max_num_queries(2):
+            scores = self.get_scores(client, title_id)
+        assert scores['distribution'] == {
+            '1': 0, '2': 1, '3': 0, '4': 1, '5': 0,
+            '6': 0, '7': 0, '8': 0, '9': 1, '10': 0,
+        }, (
+            'Проверьте, что поле `scores.distribution` содержит количество '
+            'отзывов с каждой оценкой от 1 до 10.'
+        )
+        assert scores['median'] == 4
+
+        admin_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review['id']
+            ),
+            data={'score': 4}
+        )
+        scores = self.get_scores(client, title_id)
+        assert scores['distribution']['2'] == 0
+        assert scores['distribution']['4'] == 2
+        assert scores['percentiles'] == {
+            '10': 4, '25': 4, '75': 6.5, '90': 8.0
+        }, (
+            'Проверьте, что процентили считаются с линейной интерполяцией.'
+        )
+
+        admin_client.delete(self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review['id']
+        ))
+        scores = self.get_scores(client, title_id)
+        assert scores['distribution']['4'] == 1
+        assert scores['median'] == 6.5
+
+    def test_02_recount_ratings_fixes_histogram(self, admin_client,
+                                                user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Плохо', 2)
+        create_single_review(user_client, title_id, 'Отлично', 10)
+        Title.objects.filter(pk=title_id).update(
+            score_2_count=0, score_5_count=3
+        )
+
+        call_command('recount_ratings', '--chunk-size', '1')
+        title = Title.objects.get(pk=title_id)
+        assert title.score_counts == [0, 1, 0, 0, 0, 0, 0, 0, 0, 1], (
+            'Проверьте, что `recount_ratings` восстанавливает гистограмму '
+            'оценок по отзывам.'
+        )
+
+    def test_03_list_includes_scores_on_request(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'Плохо', 2)
+
+        response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert all(
+            'scores' not in title for title in response.json()['results']
+        ), (
+            'Проверьте, что список произведений по умолчанию не содержит '
+            'поле `scores`.'
+        )
+
+        response = client.get(self.TITLES_URL, {'include': 'scores'})
+        results = {
+            title['id']: title for title in response.json()['results']
+        }
+        assert results[titles[0]['id']]['scores']['median'] == 2, (
+            'Проверьте, что с параметром `include=scores` список '
+            'произведений содержит поле `scores`.'
+        )
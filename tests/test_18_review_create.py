@@ -0,0 +1,57 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ReviewCreate:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    # Пользователь из токена, произведение, BEGIN, INSERT отзыва
+    # и UPDATE счётчиков.
+    CREATE_QUERIES = 5
+
+    def test_01_create_in_single_round_trip(self, admin_client, user_client,
+                                            django_assert_num_queries):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with django_assert_num_queries(self.CREATE_QUERIES):
+            response = user_client.post(url, data={'text': 'Ок', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что POST-запрос авторизованного пользователя к '
+            f'`{url}` создаёт отзыв.'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.review_count) == (7, 1)
+
+    def test_02_duplicate_review_is_rejected(self, admin_client, user_client):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        user_client.post(url, data={'text': 'Ок', 'score': 7})
+        response = user_client.post(url, data={'text': 'Ещё', 'score': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв на то же произведение '
+            'возвращает ответ со статусом 400.'
+        )
+        assert response.json() == {
+            'non_field_errors': [
+                'Вы уже оставили отзыв для этого произведения'
+            ]
+        }
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.review_count) == (7, 1), (
+            'Проверьте, что отклонённый отзыв не меняет счётчики рейтинга.'
+        )
+        assert Review.objects.count() == 1
+
+        response = user_client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=0),
+            data={'text': 'Ок', 'score': 7}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
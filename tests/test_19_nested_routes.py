@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19NestedRoutes:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/'
+    )
+
+    def parent_lookups(self, context, table):
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and f'FROM "{table}" WHERE' in query['sql']
+        ]
+
+    def test_01_mismatched_title_and_review(self, admin_client, admin, user,
+                                            user_client):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        review = reviews[0]
+        other_title_id = titles[1]['id']
+        urls = (
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=other_title_id, review_id=review['id']
+            ),
+            self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                title_id=other_title_id, review_id=review['id'],
+                comment_id=comments[0]['id']
+            ),
+        )
+        for url in urls:
+            assert admin_client.get(url).status_code == (
+                HTTPStatus.NOT_FOUND
+            ), (
+                f'Проверьте, что GET-запрос к `{url}` с отзывом к другому '
+                'произведению возвращает ответ со статусом 404.'
+            )
+        response = admin_client.post(urls[0], data={'text': 'Мимо'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_single_parent_lookup(self, admin_client, admin, user,
+                                     user_client):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        kwargs = {'title_id': titles[0]['id'], 'review_id': reviews[0]['id']}
+        requests = (
+            ('get', self.COMMENTS_URL_TEMPLATE.format(**kwargs), None),
+            ('post', self.COMMENTS_URL_TEMPLATE.format(**kwargs),
+             {'text': 'Ещё'}),
+            ('patch', self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                comment_id=comments[0]['id'], **kwargs
+            ), {'text': 'Правка'}),
+        )
+        for method, url, data in requests:
+            with CaptureQueriesContext(connection) as context:
+                response = getattr(admin_client, method)(url, data=data)
+            assert response.status_code in (HTTPStatus.OK, HTTPStatus.CREATED)
+            assert len(self.parent_lookups(context, 'reviews_review')) == 1, (
+                f'Проверьте, что {method.upper()}-запрос к `{url}` ищет '
+                'отзыв ровно один раз.'
+            )
+
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with CaptureQueriesContext(connection) as context:
+            admin_client.get(url)
+        assert len(self.parent_lookups(context, 'reviews_title')) == 1
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments, create_single_comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20CommentCount:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/'
+    )
+
+    def get_counts(self, client, title_id):
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return {
+            review['id']: review.get('comment_count')
+            for review in response.json()['results']
+        }
+
+    def test_01_count_follows_comment_writes(self, client, admin_client,
+                                             admin, user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        counts = self.get_counts(client, title_id)
+        assert counts[review_id] == 2, (
+            'Проверьте, что в списке отзывов есть поле `comment_count` с '
+            'количеством комментариев к отзыву.'
+        )
+
+        create_single_comment(user_client, title_id, review_id, 'Ещё')
+        assert self.get_counts(client, title_id)[review_id] == 3, (
+            'Проверьте, что новый комментарий сразу виден в `comment_count`, '
+            'в том числе в закэшированном списке отзывов.'
+        )
+
+        admin_client.delete(self.COMMENT_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id,
+            comment_id=comments[0]['id']
+        ))
+        assert self.get_counts(client, title_id)[review_id] == 2
+
+        user.delete()
+        assert self.get_counts(client, title_id)[review_id] == 0, (
+            'Проверьте, что каскадное удаление комментариев уменьшает '
+            '`comment_count`.'
+        )
+
+    def test_02_recount_comments(self, admin_client, admin, user,
+                                 user_client):
+        from reviews.models import Review
+
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, _ = create_comments(admin_client, author_map)
+        Review.objects.update(comment_count=7)
+
+        call_command('recount_comments', '--dry-run')
+        assert Review.objects.get(pk=reviews[0]['id']).comment_count == 7
+
+        call_command('recount_comments', '--chunk-size', '1')
+        counts = dict(Review.objects.values_list('pk', 'comment_count'))
+        assert counts[reviews[0]['id']] == 2, (
+            'Проверьте, что `recount_comments` восстанавливает счётчики '
+            'комментариев.'
+        )
+        assert counts[reviews[1]['id']] == 0
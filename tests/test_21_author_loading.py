@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21AuthorLoading:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def user_queries(self, client, method, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method)(url, data=data)
+        assert response.status_code == HTTPStatus.OK
+        return response, [
+            query['sql'] for query in context.captured_queries
+            if 'FROM "users_user"' in query['sql']
+        ]
+
+    def test_01_lists_load_authors_in_one_query(self, client, admin_client,
+                                                admin, user, user_client,
+                                                moderator, moderator_client):
+        from reviews.models import Comment
+
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        review = reviews[0]
+        for author in author_map:
+            for idx in range(3):
+                Comment.objects.create(
+                    review_id=review['id'], author=author, text=f'{idx}'
+                )
+        urls = (
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=review['id']
+            ),
+        )
+        for url in urls:
+            response, queries = self.user_queries(client, 'get', url)
+            assert len(response.json()['results']) > 1
+            assert not queries, (
+                f'Проверьте, что GET-запрос к `{url}` загружает авторов '
+                'тем же запросом, что и сами объекты.'
+            )
+            assert all(
+                item['author'] for item in response.json()['results']
+            )
+
+    def test_02_permission_check_reuses_request_user(self, admin_client,
+                                                     admin, user,
+                                                     user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        own_review = next(
+            review for review in reviews if review['author'] == user.username
+        )
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=own_review['id']
+        )
+        response, queries = self.user_queries(
+            user_client, 'patch', url, {'text': 'Правка'}
+        )
+        assert response.json()['author'] == user.username
+        assert len(queries) == 1, (
+            'Проверьте, что при проверке прав автора отзыва используется '
+            'уже загруженный пользователь запроса.'
+        )
@@ -0,0 +1,112 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22RecentReviews:
+
+    RECENT_URL = '/api/v1/reviews/recent/'
+
+    def create_reviews(self, amount):
+        from reviews.models import Category, Genre, Review, Title
+        from users.models import User
+
+        films = Category.objects.create(name='Фильмы', slug='films')
+        books = Category.objects.create(name='Книги', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        film = Title.objects.create(name='Фильм', year=2000, category=films)
+        film.genre.set([drama])
+        book = Title.objects.create(name='Книга', year=2000, category=books)
+        reviews = []
+        for idx in range(amount):
+            author = User.objects.create(
+                username=f'critic{idx}', email=f'critic{idx}@yamdb.fake'
+            )
+            reviews.append(Review.objects.create(
+                title=film if idx % 2 else book,
+                author=author, text=f'Отзыв {idx}', score=5,
+            ))
+        return reviews
+
+    def walk(self, client, params=None):
+        response = client.get(self.RECENT_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.RECENT_URL}` возвращает '
+            'статус 200.'
+        )
+        data = response.json()
+        rows = data['results']
+        while data['next']:
+            data = client.get(data['next']).json()
+            rows.extend(data['results'])
+        return rows
+
+    def test_01_feed_is_newest_first(self, client):
+        reviews = self.create_reviews(25)
+        rows = self.walk(client)
+        assert [row['id'] for row in rows] == [
+            review.id for review in reversed(reviews)
+        ], (
+            'Проверьте, что лента отдаёт отзывы всех произведений от новых '
+            'к старым без пропусков и повторов.'
+        )
+        newest = rows[0]
+        assert newest['title_name'] == 'Книга'
+        assert newest['author'] == 'critic24'
+        assert newest['title'] == reviews[-1].title_id
+
+    def test_02_filters(self, client):
+        self.create_reviews(6)
+        assert {row['title_name'] for row in self.walk(
+            client, {'category': 'films'}
+        )} == {'Фильм'}
+        assert len(self.walk(client, {'genre': 'drama'})) == 3
+        assert self.walk(client, {'genre': 'comedy'}) == []
+
+    @pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='EXPLAIN QUERY PLAN есть только в SQLite'
+    )
+    def test_03_page_uses_pub_date_index(self, client):
+        self.create_reviews(15)
+        first = client.get(self.RECENT_URL).json()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(first['next'])
+        assert response.status_code == HTTPStatus.OK
+        selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+        ]
+        assert len(selects) == 1, (
+            'Проверьте, что страница ленты загружается одним запросом '
+            'вместе с произведением и автором.'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + selects[0])
+            plan = [row[-1] for row in cursor.fetchall()]
+        assert not [step for step in plan if 'TEMP B-TREE' in step], (
+            'Проверьте, что лента сортируется по индексу pub_date, а не '
+            'во временном B-дереве.\n' + '\n'.join(plan)
+        )
+        assert any('reviews_review' in step and 'INDEX' in step
+                   for step in plan), '\n'.join(plan)
+
+    def test_04_comment_count_is_fresh(self, client, user_client):
+        review = self.create_reviews(1)[0]
+        response = client.get(self.RECENT_URL)
+        assert response.json()['results'][0]['comment_count'] == 0
+        assert client.get(self.RECENT_URL)['X-Cache'] == 'HIT'
+
+        create_single_comment(
+            user_client, review.title_id, review.id, 'Комментарий'
+        )
+        response = client.get(self.RECENT_URL)
+        assert response.json()['results'][0]['comment_count'] == 1, (
+            'Проверьте, что новый комментарий сбрасывает кэш ленты и '
+            'она показывает актуальный `comment_count`.'
+        )
@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23UserHistory:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/users/{username}/reviews/'
+    COMMENTS_URL_TEMPLATE = '/api/v1/users/{username}/comments/'
+
+    def walk(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос модератора к `{url}` возвращает '
+            'статус 200.'
+        )
+        data = response.json()
+        rows = data['results']
+        while data['next']:
+            data = client.get(data['next']).json()
+            rows.extend(data['results'])
+        return rows
+
+    def test_01_history_of_user(self, admin_client, admin, user, user_client,
+                                moderator_client):
+        from reviews.models import Comment, Review, Title
+
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        for idx in range(12):
+            Comment.objects.create(
+                review_id=reviews[0]['id'], author=user, text=f'{idx}'
+            )
+        title = Title.objects.get(pk=titles[1]['id'])
+        Review.objects.create(title=title, author=user, text='Ещё', score=3)
+
+        rows = self.walk(
+            moderator_client,
+            self.REVIEWS_URL_TEMPLATE.format(username=user.username)
+        )
+        assert [row['title_name'] for row in rows] == [
+            title.name, titles[0]['name']
+        ], (
+            'Проверьте, что история отзывов содержит все отзывы '
+            'пользователя от новых к старым.'
+        )
+        assert {row['author'] for row in rows} == {user.username}
+
+        rows = self.walk(
+            admin_client,
+            self.COMMENTS_URL_TEMPLATE.format(username=user.username)
+        )
+        assert len(rows) == 13
+        assert rows[0]['text'] == '11'
+        assert {row['title'] for row in rows} == {titles[0]['id']}
+        assert {row['review'] for row in rows} == {reviews[0]['id']}
+
+    def test_02_history_permissions(self, client, user, user_client,
+                                    moderator_client):
+        url = self.REVIEWS_URL_TEMPLATE.format(username=user.username)
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что обычный пользователь не видит `{url}`.'
+        )
+        assert moderator_client.get(
+            self.COMMENTS_URL_TEMPLATE.format(username='nobody')
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='EXPLAIN QUERY PLAN есть только в SQLite'
+    )
+    @pytest.mark.parametrize('template', [
+        REVIEWS_URL_TEMPLATE, COMMENTS_URL_TEMPLATE
+    ])
+    def test_03_history_uses_author_index(self, admin_client, admin, user,
+                                          user_client, moderator_client,
+                                          template):
+        author_map = {admin: admin_client, user: user_client}
+        create_comments(admin_client, author_map)
+        with CaptureQueriesContext(connection) as context:
+            moderator_client.get(template.format(username=user.username))
+        page_sql = context.captured_queries[-1]['sql']
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + page_sql)
+            plan = [row[-1] for row in cursor.fetchall()]
+        assert any('author_pub_date_idx' in step for step in plan), (
+            'Проверьте, что история пользователя читается по индексу '
+            '(author, pub_date).\n' + '\n'.join(plan)
+        )
+        assert not [step for step in plan if 'TEMP B-TREE' in step]
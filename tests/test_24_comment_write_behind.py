@@ -0,0 +1,127 @@
+import json
+import time
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews
+
+
+@pytest.fixture
+def write_behind(settings, tmp_path):
+    settings.COMMENT_WRITE_BEHIND = True
+    settings.COMMENT_JOURNAL = tmp_path / 'comments.jsonl'
+    settings.COMMENT_BATCH_SIZE = 3
+    settings.COMMENT_FLUSH_INTERVAL = 60
+    yield settings
+    from api.ingest import flush
+    flush()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24CommentWriteBehind:
+
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def setup_review(self, admin_client, admin, user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        return self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        ), reviews[0]['id']
+
+    def test_01_batch_flush_on_size(self, write_behind, admin_client, admin,
+                                    user, user_client):
+        from reviews.models import Comment, Review
+
+        url, review_id = self.setup_review(
+            admin_client, admin, user, user_client
+        )
+        keys = []
+        for idx in range(2):
+            response = user_client.post(url, data={'text': f'Гол {idx}'})
+            assert response.status_code == HTTPStatus.ACCEPTED, (
+                'Проверьте, что в режиме отложенной записи POST-запрос к '
+                f'`{url}` возвращает ответ со статусом 202.'
+            )
+            assert response.json()['author'] == user.username
+            keys.append(response.json()['provisional_id'])
+        assert not Comment.objects.exists()
+        assert write_behind.COMMENT_JOURNAL.exists()
+
+        user_client.post(url, data={'text': 'Гол 2'})
+        assert Comment.objects.count() == 3, (
+            'Проверьте, что при заполнении пачки комментарии записываются '
+            'в базу.'
+        )
+        assert set(keys) <= set(
+            Comment.objects.values_list('ingest_key', flat=True)
+        )
+        assert Review.objects.get(pk=review_id).comment_count == 3
+        assert len(admin_client.get(url).json()['results']) == 3
+
+    def test_02_validation_is_synchronous(self, write_behind, admin_client,
+                                          admin, user, user_client):
+        url, review_id = self.setup_review(
+            admin_client, admin, user, user_client
+        )
+        response = user_client.post(url, data={})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = user_client.post(
+            self.COMMENTS_URL_TEMPLATE.format(title_id=0, review_id=review_id),
+            data={'text': 'Мимо'}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert not write_behind.COMMENT_JOURNAL.exists()
+
+    def test_03_flush_on_timer(self, write_behind, admin_client, admin, user,
+                               user_client):
+        from reviews.models import Comment
+
+        write_behind.COMMENT_FLUSH_INTERVAL = 0.1
+        url, _ = self.setup_review(admin_client, admin, user, user_client)
+        user_client.post(url, data={'text': 'Одинокий'})
+        deadline = time.monotonic() + 5
+        while not Comment.objects.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert Comment.objects.filter(text='Одинокий').exists(), (
+            'Проверьте, что неполная пачка записывается по таймеру.'
+        )
+
+    def test_04_replay_after_crash(self, write_behind, admin_client, admin,
+                                   user, user_client):
+        from reviews.models import Comment, Review
+
+        _, review_id = self.setup_review(
+            admin_client, admin, user, user_client
+        )
+        entries = [
+            {'key': f'{idx:032x}', 'review': review_id,
+             'author': user.pk, 'text': f'Из журнала {idx}'}
+            for idx in range(4)
+        ]
+        Comment.objects.create(
+            review_id=review_id, author=user, text='Из журнала 0',
+            ingest_key=entries[0]['key'],
+        )
+        journal = write_behind.COMMENT_JOURNAL
+        journal.with_suffix('.flushing').write_text(''.join(
+            json.dumps(entry) + '\n' for entry in entries[:2]
+        ))
+        journal.write_text(''.join(
+            json.dumps(entry) + '\n' for entry in entries[2:]
+        ) + '{"key": "обрыв')
+
+        call_command('flush_comments')
+        assert sorted(Comment.objects.values_list('text', flat=True)) == [
+            f'Из журнала {idx}' for idx in range(4)
+        ], (
+            'Проверьте, что `flush_comments` дочитывает журнал после сбоя '
+            'и не дублирует уже записанные комментарии.'
+        )
+        assert Review.objects.get(pk=review_id).comment_count == 4
+        assert not journal.exists()
+        assert not journal.with_suffix('.flushing').exists()
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25CommentArchive:
+
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def setup_comments(self, admin_client, admin, user, user_client):
+        from reviews.models import Comment
+
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        review_id = reviews[0]['id']
+        comments = [
+            Comment.objects.create(
+                review_id=review_id, author=user if idx % 2 else admin,
+                text=f'Комментарий {idx}'
+            )
+            for idx in range(12)
+        ]
+        old = timezone.now() - timedelta(days=1000)
+        for idx, comment in enumerate(comments[:7]):
+            Comment.objects.filter(pk=comment.pk).update(
+                pub_date=old + timedelta(minutes=idx)
+            )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=review_id
+        )
+        return url, review_id, comments
+
+    def test_01_archive_moves_old_comments(self, admin_client, admin, user,
+                                           user_client):
+        from reviews.models import ArchivedComment, Comment, Review
+
+        url, review_id, comments = self.setup_comments(
+            admin_client, admin, user, user_client
+        )
+        call_command('archive_comments', '--chunk-size', '3')
+        assert Comment.objects.count() == 5, (
+            'Проверьте, что `archive_comments` убирает старые комментарии '
+            'из основной таблицы.'
+        )
+        archived = ArchivedComment.objects.get(pk=comments[0].pk)
+        assert archived.text == 'Комментарий 0'
+        assert bytes(archived.compressed_text) != 'Комментарий 0'.encode()
+        assert Review.objects.get(pk=review_id).comment_count == 12
+
+        user.delete()
+        assert Review.objects.get(pk=review_id).comment_count == 6
+
+    def test_02_reads_fall_back_to_archive(self, client, admin_client, admin,
+                                           user, user_client):
+        url, _, comments = self.setup_comments(
+            admin_client, admin, user, user_client
+        )
+        expected = [comment.id for comment in reversed(comments[7:])] + [
+            comment.id for comment in reversed(comments[:7])
+        ]
+        before = client.get(url).json()
+        call_command('archive_comments')
+
+        first = client.get(url).json()
+        assert first['count'] == 12
+        second = client.get(first['next']).json()
+        ids = [row['id'] for row in first['results'] + second['results']]
+        assert ids == expected, (
+            'Проверьте, что список комментариев после живых записей '
+            'продолжается архивными.'
+        )
+        assert first['results'] == before['results']
+
+        data = client.get(url, {'cursor': ''}).json()
+        rows = data['results']
+        while data['next']:
+            data = client.get(data['next']).json()
+            rows.extend(data['results'])
+        assert [row['id'] for row in rows] == expected
+        previous = client.get(data['previous']).json()
+        assert [row['id'] for row in previous['results']] == expected[:10]
+
+        response = client.get(f'{url}{comments[0].id}/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['text'] == 'Комментарий 0'
+        assert response.json()['author'] == admin.username
+        response = admin_client.patch(
+            f'{url}{comments[0].id}/', data={'text': 'Правка'}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_delete_archived_comment(self, admin_client, admin, user,
+                                        user_client):
+        from reviews.models import ArchivedComment, Review
+
+        url, review_id, comments = self.setup_comments(
+            admin_client, admin, user, user_client
+        )
+        call_command('archive_comments')
+        own = f'{url}{comments[1].id}/'
+        other = f'{url}{comments[0].id}/'
+        response = user_client.delete(other)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что чужой архивный комментарий нельзя удалить.'
+        )
+        response = user_client.delete(own)
+        assert response.status_code == HTTPStatus.NO_CONTENT, (
+            'Проверьте, что автор может удалить архивный комментарий.'
+        )
+        assert not ArchivedComment.objects.filter(pk=comments[1].pk).exists()
+        assert Review.objects.get(pk=review_id).comment_count == 11
+        assert user_client.get(own).status_code == HTTPStatus.NOT_FOUND
+        assert user_client.get(url).json()['count'] == 11
@@ -0,0 +1,132 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26Idempotency:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_retry_replays_response(self, admin_client, user_client,
+                                       django_assert_num_queries):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        data = {'text': 'Отлично', 'score': 9}
+        first = user_client.post(url, data=data, HTTP_IDEMPOTENCY_KEY='r-1')
+        assert first.status_code == HTTPStatus.CREATED
+
+        # Пользователь из токена и поиск ключа.
+        with django_assert_num_queries(2):
+            retry = user_client.post(
+                url, data=data, HTTP_IDEMPOTENCY_KEY='r-1'
+            )
+        assert retry.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что повтор POST-запроса с тем же Idempotency-Key '
+            'возвращает сохранённый ответ, а не ошибку 400.'
+        )
+        assert retry.json() == first.json()
+        assert retry['Idempotent-Replayed'] == 'true'
+        assert Review.objects.count() == 1
+
+        response = user_client.post(
+            url, data={'text': 'Другое', 'score': 1},
+            HTTP_IDEMPOTENCY_KEY='r-1'
+        )
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+        response = admin_client.post(
+            url, data=data, HTTP_IDEMPOTENCY_KEY='r-1'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что ключи идемпотентности разных пользователей '
+            'не пересекаются.'
+        )
+
+    def test_02_errors_are_not_stored(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = user_client.post(
+            url, data={'text': 'Ок', 'score': 11}, HTTP_IDEMPOTENCY_KEY='r-2'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = user_client.post(
+            url, data={'text': 'Ок', 'score': 10}, HTTP_IDEMPOTENCY_KEY='r-2'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_03_signup_sends_one_email(self, client):
+        data = {'username': 'retry', 'email': 'retry@yamdb.fake'}
+        outbox = len(mail.outbox)
+        for _ in range(3):
+            response = client.post(
+                self.SIGNUP_URL, data=data, HTTP_IDEMPOTENCY_KEY='s-1'
+            )
+            assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox + 1, (
+            'Проверьте, что повтор регистрации с тем же Idempotency-Key '
+            'не отправляет письмо ещё раз.'
+        )
+
+    def test_04_expired_keys(self, client):
+        from reviews.models import IdempotencyKey
+
+        data = {'username': 'retry', 'email': 'retry@yamdb.fake'}
+        client.post(self.SIGNUP_URL, data=data, HTTP_IDEMPOTENCY_KEY='s-2')
+        client.post(self.SIGNUP_URL, data=data, HTTP_IDEMPOTENCY_KEY='s-3')
+        IdempotencyKey.objects.filter(key='s-2').update(
+            created=timezone.now() - timedelta(days=2)
+        )
+        outbox = len(mail.outbox)
+        client.post(self.SIGNUP_URL, data=data, HTTP_IDEMPOTENCY_KEY='s-2')
+        assert len(mail.outbox) == outbox + 1, (
+            'Проверьте, что просроченный ключ не воспроизводит ответ.'
+        )
+
+        IdempotencyKey.objects.update(
+            created=timezone.now() - timedelta(days=2)
+        )
+        call_command('purge_idempotency_keys')
+        assert not IdempotencyKey.objects.exists()
+
+    def test_05_abandoned_reservation(self, client):
+        from reviews.models import IdempotencyKey
+
+        data = {'username': 'crashed', 'email': 'crashed@yamdb.fake'}
+        client.post(self.SIGNUP_URL, data=data, HTTP_IDEMPOTENCY_KEY='s-4')
+        record = IdempotencyKey.objects.get(key='s-4')
+        # Процесс упал, не записав ответ и не сняв бронь.
+        IdempotencyKey.objects.filter(pk=record.pk).update(
+            status_code=None, response_data=None
+        )
+        response = client.post(
+            self.SIGNUP_URL, data=data, HTTP_IDEMPOTENCY_KEY='s-4'
+        )
+        assert response.status_code == HTTPStatus.CONFLICT, (
+            'Проверьте, что ключ в работе отвечает 409, пока не истекла '
+            'аренда.'
+        )
+
+        IdempotencyKey.objects.filter(pk=record.pk).update(
+            created=timezone.now() - timedelta(minutes=5)
+        )
+        outbox = len(mail.outbox)
+        response = client.post(
+            self.SIGNUP_URL, data=data, HTTP_IDEMPOTENCY_KEY='s-4'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что брошенная бронь ключа перехватывается повтором '
+            'после истечения аренды.'
+        )
+        assert len(mail.outbox) == outbox + 1
+        record = IdempotencyKey.objects.get(key='s-4')
+        assert record.status_code == HTTPStatus.OK
@@ -0,0 +1,235 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27OptimisticLocking:
+
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/'
+    )
+    USER_DETAIL_URL_TEMPLATE = '/api/v1/users/{username}/'
+    ME_URL = '/api/v1/users/me/'
+
+    def test_01_stale_if_match(self, admin_client, admin, user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        comment_id = comments[0]['id']
+        cases = (
+            (self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title_id),
+             'name', 'Новое имя', 'Ещё одно имя'),
+            (self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            ), 'text', 'Новый текст', 'Ещё один текст'),
+            (self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id, comment_id=comment_id
+            ), 'text', 'Новый текст', 'Ещё один текст'),
+            (self.USER_DETAIL_URL_TEMPLATE.format(username=user.username),
+             'bio', 'Новая биография', 'Ещё одна биография'),
+        )
+        for url, field, first, second in cases:
+            etag = admin_client.get(url)['ETag']
+            response = admin_client.patch(
+                url, data={field: first}, HTTP_IF_MATCH=etag
+            )
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что PATCH-запрос к `{url}` с актуальным '
+                '`If-Match` выполняется.'
+            )
+            assert response['ETag'] != etag, (
+                f'Проверьте, что ответ на PATCH-запрос к `{url}` содержит '
+                'новый ETag.'
+            )
+            new_etag = response['ETag']
+
+            response = admin_client.patch(
+                url, data={field: second}, HTTP_IF_MATCH=etag
+            )
+            assert response.status_code == HTTPStatus.PRECONDITION_FAILED, (
+                f'Проверьте, что PATCH-запрос к `{url}` с устаревшим '
+                '`If-Match` возвращает статус 412.'
+            )
+            assert admin_client.get(url).json()[field] == first, (
+                'Проверьте, что запрос с устаревшим `If-Match` ничего не '
+                'записывает.'
+            )
+
+            response = admin_client.patch(
+                url, data={field: second}, HTTP_IF_MATCH=new_etag
+            )
+            assert response.status_code == HTTPStatus.OK
+            assert response.json()[field] == second
+
+    def test_02_other_review_keeps_etag(self, admin_client, admin, user,
+                                        user_client, moderator_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        etag = admin_client.get(url)['ETag']
+        create_single_review(moderator_client, titles[0]['id'], 'Текст', 3)
+        response = admin_client.patch(
+            url, data={'text': 'Правка'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв к тому же произведению не делает '
+            'устаревшим ETag другого отзыва.'
+        )
+
+    def test_03_update_writes_changed_fields(self, admin_client, admin,
+                                             user, user_client):
+        from reviews.models import Review, Title
+
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        review = Review.objects.get(pk=reviews[0]['id'])
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=review.pk
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(url, data={'text': 'Правка'})
+        assert response.status_code == HTTPStatus.OK
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_review"')
+        ]
+        assert len(updates) == 1, (
+            'Проверьте, что изменение отзыва записывается одним UPDATE.'
+        )
+        assert '"version" = ' in updates[0].split('WHERE')[1], (
+            'Проверьте, что UPDATE выполняется с условием на версию строки.'
+        )
+        assert 'comment_count' not in updates[0], (
+            'Проверьте, что PATCH записывает только изменившиеся поля.'
+        )
+        reloaded = Review.objects.get(pk=review.pk)
+        assert reloaded.version == review.version + 1
+        assert reloaded.comment_count == review.comment_count
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title.pk),
+                data={'name': title.name, 'year': title.year},
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert not [
+            query for query in context.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ], 'Проверьте, что PATCH без изменений не пишет в базу.'
+        assert Title.objects.get(pk=title.pk).version == title.version
+
+    def test_04_concurrent_save_conflicts(self, admin_client, admin, user,
+                                          user_client):
+        from api.versioning import VersionConflict
+        from reviews.models import Title
+
+        author_map = {admin: admin_client, user: user_client}
+        create_comments(admin_client, author_map)
+        title = Title.objects.first()
+        first = Title.objects.get(pk=title.pk)
+        second = Title.objects.get(pk=title.pk)
+        first.name = 'Первая правка'
+        first.save(update_fields=['name'])
+
+        second.name = 'Вторая правка'
+        with pytest.raises(VersionConflict):
+            second.save(update_fields=['name'])
+        assert second.version == title.version
+        reloaded = Title.objects.get(pk=title.pk)
+        assert reloaded.name == 'Первая правка', (
+            'Проверьте, что сохранение устаревшего объекта не затирает '
+            'чужую правку.'
+        )
+        assert reloaded.review_count == title.review_count
+
+    def test_05_if_match_ignores_unrelated_writes(self, client,
+                                                  admin_client, admin, user,
+                                                  user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        etag = admin_client.get(url)['ETag']
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'newcomer', 'email': 'newcomer@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        response = admin_client.patch(
+            url, data={'text': 'Правка'}, HTTP_IF_MATCH=etag,
+            HTTP_ACCEPT='application/json; indent=2',
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `If-Match` сверяется с версией строки, а не с '
+            'версиями несвязанных таблиц и заголовком `Accept`.'
+        )
+
+        other_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[1]['id']
+        )
+        response = admin_client.patch(
+            other_url, data={'text': 'Правка'},
+            HTTP_IF_MATCH=admin_client.get(url)['ETag'],
+        )
+        assert response.status_code == HTTPStatus.PRECONDITION_FAILED, (
+            'Проверьте, что ETag другого объекта не проходит `If-Match`.'
+        )
+
+    def test_06_own_profile_if_match(self, user, user_client, admin_client):
+        response = user_client.get(self.ME_URL)
+        etag = response['ETag']
+        assert etag.startswith(f'"{user.pk}-'), (
+            f'Проверьте, что ответ на GET-запрос к `{self.ME_URL}` содержит '
+            'ETag по id и версии строки пользователя.'
+        )
+        assert user_client.get(
+            self.ME_URL, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.NOT_MODIFIED
+        assert admin_client.get(self.ME_URL)['ETag'] != etag
+
+        response = user_client.patch(
+            self.ME_URL, data={'bio': 'Выдумка'}, HTTP_IF_MATCH='"999-999-x"'
+        )
+        assert response.status_code == HTTPStatus.PRECONDITION_FAILED, (
+            f'Проверьте, что PATCH-запрос к `{self.ME_URL}` с чужим '
+            '`If-Match` возвращает статус 412.'
+        )
+
+        response = user_client.patch(
+            self.ME_URL, data={'bio': 'Новая биография'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что PATCH-запрос к `{self.ME_URL}` с актуальным '
+            '`If-Match` выполняется.'
+        )
+        assert response['ETag'] != etag
+        new_etag = response['ETag']
+
+        response = user_client.patch(
+            self.ME_URL, data={'bio': 'Ещё одна'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.PRECONDITION_FAILED, (
+            f'Проверьте, что PATCH-запрос к `{self.ME_URL}` с устаревшим '
+            '`If-Match` возвращает статус 412.'
+        )
+        assert user_client.get(self.ME_URL).json()['bio'] == (
+            'Новая биография'
+        )
+        response = user_client.patch(
+            self.ME_URL, data={'bio': 'Ещё одна'}, HTTP_IF_MATCH=new_etag
+        )
+        assert response.status_code == HTTPStatus.OK
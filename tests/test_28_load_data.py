@@ -0,0 +1,127 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from tests.utils import read_rows, write_rows
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28LoadData:
+
+    def test_01_loads_all_files(self, data_dir, django_assert_max_num_queries):
+        from reviews.models import Category, Comment, Genre, Review, Title
+        from users.models import User
+
+        with django_assert_max_num_queries(60):
+            call_command('load_data', '--path', str(data_dir),
+                         stdout=StringIO())
+        expected = {
+            Category: 'category', Genre: 'genre', User: 'users',
+            Title: 'titles', Title.genre.through: 'genre_title',
+            Review: 'review', Comment: 'comments',
+        }
+        for model, name in expected.items():
+            assert model.objects.count() == len(read_rows(data_dir, name)), (
+                f'Проверьте, что `load_data` загружает все строки {name}.csv.'
+            )
+
+        row = read_rows(data_dir, 'review')[0]
+        review = Review.objects.get(pk=row['id'])
+        assert review.pub_date.year == int(row['pub_date'][:4]), (
+            'Проверьте, что `load_data` сохраняет дату публикации из файла.'
+        )
+        title = Title.objects.get(pk=review.title_id)
+        scores = list(title.reviews.values_list('score', flat=True))
+        assert title.review_count == len(scores)
+        assert title.rating == sum(scores) / len(scores), (
+            'Проверьте, что после загрузки пересчитан рейтинг произведений.'
+        )
+        commented = Review.objects.get(
+            pk=read_rows(data_dir, 'comments')[0]['review_id']
+        )
+        assert commented.comment_count == commented.comments.count()
+
+        output = StringIO()
+        call_command('load_data', '--path', str(data_dir), stdout=output)
+        assert Review.objects.count() == len(read_rows(data_dir, 'review'))
+        assert 'добавлено 0' in output.getvalue()
+
+    def test_02_conflict_modes(self, data_dir):
+        from reviews.models import Category, Title
+
+        call_command('load_data', '--path', str(data_dir), stdout=StringIO())
+        categories = read_rows(data_dir, 'category')
+        write_rows(data_dir, 'category', categories + [
+            {'id': '99', 'name': 'Подкаст', 'slug': 'podcast'}
+        ])
+        titles = read_rows(data_dir, 'titles')
+        titles[0]['name'] = 'Новое имя'
+        write_rows(data_dir, 'titles', titles)
+        title = Title.objects.get(pk=titles[0]['id'])
+
+        with pytest.raises(CommandError):
+            call_command('load_data', '--path', str(data_dir),
+                         '--on-conflict', 'fail', stdout=StringIO())
+        assert not Category.objects.filter(pk=99).exists(), (
+            'Проверьте, что при конфликте в режиме `fail` загрузка '
+            'откатывается целиком.'
+        )
+
+        call_command('load_data', '--path', str(data_dir), stdout=StringIO())
+        assert Category.objects.filter(pk=99).exists()
+        assert Title.objects.get(pk=title.pk).name == title.name, (
+            'Проверьте, что в режиме `skip` существующие записи не меняются.'
+        )
+
+        call_command('load_data', '--path', str(data_dir),
+                     '--on-conflict', 'update', stdout=StringIO())
+        updated = Title.objects.get(pk=title.pk)
+        assert updated.name == 'Новое имя', (
+            'Проверьте, что в режиме `update` существующие записи '
+            'обновляются.'
+        )
+        assert updated.version == title.version + 1
+        assert updated.rating == title.rating
+        assert updated.review_count == title.review_count
+
+    def test_03_missing_parents_are_skipped(self, data_dir):
+        from reviews.models import Review
+
+        reviews = read_rows(data_dir, 'review')
+        reviews[0]['title_id'] = '9999'
+        write_rows(data_dir, 'review', reviews)
+        output = StringIO()
+        call_command('load_data', '--path', str(data_dir), stdout=output)
+        assert Review.objects.count() == len(reviews) - 1, (
+            'Проверьте, что отзыв к несуществующему произведению '
+            'пропускается.'
+        )
+        assert not Review.objects.filter(pk=reviews[0]['id']).exists()
+        assert 'несуществующую' in output.getvalue()
+
+    def test_04_reindexes_only_loaded_titles(self, data_dir, monkeypatch):
+        from reviews import importer
+
+        call_command('load_data', '--path', str(data_dir), stdout=StringIO())
+        reindexed = []
+        monkeypatch.setattr(importer, 'fts_available', lambda: True)
+        monkeypatch.setattr(importer, 'reindex_titles', reindexed.extend)
+        titles = read_rows(data_dir, 'titles')
+        (data_dir / 'titles.csv').unlink()
+        call_command('load_data', '--path', str(data_dir),
+                     '--on-conflict', 'update', stdout=StringIO())
+        assert not reindexed, (
+            'Проверьте, что загрузка отзывов и жанров без titles.csv не '
+            'перестраивает поисковый индекс.'
+        )
+
+        titles[0]['name'] = 'Новое имя'
+        write_rows(data_dir, 'titles', titles[:1])
+        call_command('load_data', '--path', str(data_dir),
+                     '--on-conflict', 'update', stdout=StringIO())
+        assert reindexed == [int(titles[0]['id'])], (
+            'Проверьте, что переиндексируются только произведения, '
+            'записанные из titles.csv.'
+        )
@@ -0,0 +1,72 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from tests.utils import read_rows, write_rows
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29StreamingImport:
+
+    def test_01_resume_after_failure(self, data_dir):
+        from reviews.models import ImportCheckpoint, Review
+
+        reviews = read_rows(data_dir, 'review')
+        broken = [dict(row) for row in reviews]
+        broken[35]['score'] = 'десять'
+        write_rows(data_dir, 'review', broken)
+
+        with pytest.raises(ValueError):
+            call_command('load_data', '--path', str(data_dir), '--stream',
+                         '--batch-size', '10', stdout=StringIO())
+        assert Review.objects.count() == 30, (
+            'Проверьте, что в потоковом режиме каждая пачка фиксируется '
+            'отдельной транзакцией.'
+        )
+        checkpoint = ImportCheckpoint.objects.get(
+            path=str((data_dir / 'review.csv').resolve())
+        )
+        assert checkpoint.rows == 30
+
+        write_rows(data_dir, 'review', reviews)
+        output = StringIO()
+        call_command('load_data', '--path', str(data_dir), '--resume',
+                     '--batch-size', '10', stdout=output)
+        assert Review.objects.count() == len(reviews)
+        assert 'review.csv: продолжено после строки 30' in output.getvalue()
+        assert 'review.csv: добавлено 42, обновлено 0, пропущено 0' in (
+            output.getvalue()
+        ), 'Проверьте, что `--resume` не перечитывает загруженные строки.'
+        assert 'строк/с' in output.getvalue(), (
+            'Проверьте, что потоковая загрузка показывает скорость.'
+        )
+
+        output = StringIO()
+        call_command('recount_ratings', stdout=output)
+        call_command('recount_comments', stdout=output)
+        assert output.getvalue().count('Расхождений не найдено') == 2, (
+            'Проверьте, что потоковая загрузка поддерживает счётчики.'
+        )
+
+    def test_02_stream_restarts_without_resume(self, data_dir):
+        from reviews.models import Review
+
+        call_command('load_data', '--path', str(data_dir), '--stream',
+                     stdout=StringIO())
+        output = StringIO()
+        call_command('load_data', '--path', str(data_dir), '--stream',
+                     stdout=output)
+        count = Review.objects.count()
+        assert f'review.csv: добавлено 0, обновлено 0, пропущено {count}' in (
+            output.getvalue()
+        )
+
+    def test_03_stale_checkpoint(self, data_dir):
+        call_command('load_data', '--path', str(data_dir), '--stream',
+                     stdout=StringIO())
+        write_rows(data_dir, 'category', read_rows(data_dir, 'category')[:1])
+        with pytest.raises(CommandError):
+            call_command('load_data', '--path', str(data_dir), '--resume',
+                         stdout=StringIO())
@@ -0,0 +1,85 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+from tests.utils import read_rows, write_rows
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30ParallelImport:
+
+    def test_01_shards_keep_multiline_rows(self, data_dir):
+        from reviews.importer import SOURCES, parse_shard, plan_shards
+
+        reviews = read_rows(data_dir, 'review')
+        for row in reviews[::5]:
+            row['text'] = 'Первая строка,\n"вторая" строка\r\nи третья'
+        write_rows(data_dir, 'review', reviews)
+        path = data_dir / 'review.csv'
+
+        header, shards = plan_shards(path, 64)
+        assert len(shards) > 1
+        assert shards[-1][1] == path.stat().st_size
+        assert all(
+            end == next_start
+            for (_, end), (next_start, _) in zip(shards, shards[1:])
+        ), 'Проверьте, что куски файла идут подряд без пропусков.'
+        rows = [
+            values for start, end in shards
+            for values in parse_shard('review', path, start, end, header)
+        ]
+        source = next(source for source in SOURCES if source.name == 'review')
+        with open(path, encoding='utf-8', newline='') as file:
+            expected = [source.values(row) for row in csv.DictReader(file)]
+        assert rows == expected, (
+            'Проверьте, что куски режутся только между записями CSV, '
+            'а не внутри поля в кавычках.'
+        )
+
+    @override_settings(LOAD_DATA_SHARD_SIZE=256)
+    def test_02_jobs_load_all_files(self, data_dir, monkeypatch):
+        from reviews.models import Category, Comment, Genre, Review, Title
+        from users.models import User
+
+        # Рабочие процессы импортируют настройки заново: каталог проекта
+        # должен найтись раньше одноимённого каталога репозитория.
+        monkeypatch.syspath_prepend(str(settings.BASE_DIR))
+        output = StringIO()
+        call_command('load_data', '--path', str(data_dir), '--jobs', '3',
+                     '--batch-size', '7', stdout=output)
+        expected = {
+            Category: 'category', Genre: 'genre', User: 'users',
+            Title: 'titles', Title.genre.through: 'genre_title',
+            Review: 'review', Comment: 'comments',
+        }
+        for model, name in expected.items():
+            assert model.objects.count() == len(read_rows(data_dir, name)), (
+                f'Проверьте, что `load_data --jobs` загружает все строки '
+                f'{name}.csv.'
+            )
+        assert 'строк/с' in output.getvalue()
+
+        output = StringIO()
+        call_command('recount_ratings', stdout=output)
+        call_command('recount_comments', stdout=output)
+        assert output.getvalue().count('Расхождений не найдено') == 2, (
+            'Проверьте, что параллельная загрузка пересчитывает счётчики.'
+        )
+
+        output = StringIO()
+        call_command('load_data', '--path', str(data_dir), '--jobs', '2',
+                     stdout=output)
+        count = Review.objects.count()
+        assert f'review.csv: добавлено 0, обновлено 0, пропущено {count}' in (
+            output.getvalue()
+        )
+
+    def test_03_jobs_exclude_streaming(self, data_dir):
+        with pytest.raises(CommandError):
+            call_command('load_data', '--path', str(data_dir), '--jobs', '2',
+                         '--stream', stdout=StringIO())
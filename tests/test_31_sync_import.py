@@ -0,0 +1,103 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from tests.utils import read_rows, write_rows
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31SyncImport:
+
+    def test_01_sync_writes_only_changes(self, data_dir):
+        from reviews.models import Category, Title
+
+        call_command('load_data', '--path', str(data_dir), '--sync',
+                     stdout=StringIO())
+        output = StringIO()
+        call_command('load_data', '--path', str(data_dir), '--sync',
+                     stdout=output)
+        titles = read_rows(data_dir, 'titles')
+        assert (
+            f'titles.csv: добавлено 0, обновлено 0, удалено 0, '
+            f'без изменений {len(titles)}.'
+        ) in output.getvalue(), (
+            'Проверьте, что повторная синхронизация без изменений в файлах '
+            'ничего не записывает.'
+        )
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        titles[0]['name'] = 'Новое имя'
+        write_rows(data_dir, 'titles', titles)
+        write_rows(data_dir, 'category', read_rows(data_dir, 'category') + [
+            {'id': '99', 'name': 'Подкаст', 'slug': 'podcast'}
+        ])
+        output = StringIO()
+        call_command('load_data', '--path', str(data_dir), '--sync',
+                     stdout=output)
+        assert (
+            f'titles.csv: добавлено 0, обновлено 1, удалено 0, '
+            f'без изменений {len(titles) - 1}.'
+        ) in output.getvalue()
+        assert 'category.csv: добавлено 1, обновлено 0' in output.getvalue()
+        assert Category.objects.filter(pk=99).exists()
+        updated = Title.objects.get(pk=title.pk)
+        assert updated.name == 'Новое имя'
+        assert updated.version == title.version + 1
+        assert updated.rating == title.rating
+
+    def test_02_sync_restores_rows_deleted_from_database(self, data_dir):
+        from reviews.models import Review
+
+        call_command('load_data', '--path', str(data_dir), '--sync',
+                     stdout=StringIO())
+        row = read_rows(data_dir, 'review')[0]
+        Review.objects.filter(pk=row['id']).delete()
+        output = StringIO()
+        call_command('load_data', '--path', str(data_dir), '--sync',
+                     stdout=output)
+        assert Review.objects.filter(pk=row['id']).exists(), (
+            'Проверьте, что синхронизация заново добавляет записи, '
+            'удалённые из базы.'
+        )
+        assert 'review.csv: добавлено 1, обновлено 0' in output.getvalue()
+
+    def test_03_sync_delete(self, data_dir):
+        from reviews.models import Comment, Review
+
+        call_command('load_data', '--path', str(data_dir), '--sync',
+                     stdout=StringIO())
+        reviews = read_rows(data_dir, 'review')
+        gone = reviews.pop()
+        write_rows(data_dir, 'review', reviews)
+
+        call_command('load_data', '--path', str(data_dir), '--sync',
+                     stdout=StringIO())
+        assert Review.objects.filter(pk=gone['id']).exists(), (
+            'Проверьте, что без `--delete` синхронизация ничего не удаляет.'
+        )
+
+        output = StringIO()
+        call_command('load_data', '--path', str(data_dir), '--sync',
+                     '--delete', stdout=output)
+        assert not Review.objects.filter(pk=gone['id']).exists(), (
+            'Проверьте, что с `--delete` удаляются записи, пропавшие из '
+            'файла.'
+        )
+        assert 'review.csv: добавлено 0, обновлено 0, удалено 1' in (
+            output.getvalue()
+        )
+        assert not Comment.objects.filter(review_id=gone['id']).exists()
+
+        output = StringIO()
+        call_command('recount_ratings', stdout=output)
+        call_command('recount_comments', stdout=output)
+        assert output.getvalue().count('Расхождений не найдено') == 2, (
+            'Проверьте, что синхронизация поддерживает счётчики.'
+        )
+
+    def test_04_delete_requires_sync(self, data_dir):
+        with pytest.raises(CommandError):
+            call_command('load_data', '--path', str(data_dir), '--delete',
+                         stdout=StringIO())
@@ -0,0 +1,77 @@
+import csv
+import gzip
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from tests.utils import read_rows
+
+NAMES = ('category', 'genre', 'users', 'titles', 'genre_title', 'review',
+         'comments')
+
+
+def read_csv(file):
+    rows = list(csv.reader(file))
+    return rows[0], sorted(rows[1:], key=lambda row: int(row[0]))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test32DumpData:
+
+    def test_01_dump_matches_static_data(self, data_dir, tmp_path):
+        call_command('load_data', '--path', str(data_dir), stdout=StringIO())
+        output = StringIO()
+        call_command('dump_data', '--path', str(tmp_path / 'dump'),
+                     '--jobs', '1', '--chunk-size', '10', stdout=output)
+        for name in NAMES:
+            with open(data_dir / f'{name}.csv', encoding='utf-8',
+                      newline='') as file:
+                expected = read_csv(file)
+            with open(tmp_path / 'dump' / f'{name}.csv', encoding='utf-8',
+                      newline='') as file:
+                assert read_csv(file) == expected, (
+                    f'Проверьте, что `dump_data` выгружает {name}.csv с теми '
+                    'же колонками и значениями, что и в static/data.'
+                )
+            assert f'{name}.csv: выгружено строк: {len(expected[1])}' in (
+                output.getvalue()
+            )
+
+    def test_02_gzip_and_date_range(self, data_dir, tmp_path, monkeypatch):
+        from reviews.models import Review
+
+        call_command('load_data', '--path', str(data_dir), stdout=StringIO())
+        reviews = read_rows(data_dir, 'review')
+        recent = [row['id'] for row in reviews[:3]]
+        Review.objects.filter(pk__in=recent).update(
+            pub_date='2021-05-01T12:00:00Z'
+        )
+        # Рабочие процессы импортируют настройки заново: каталог проекта
+        # должен найтись раньше одноимённого каталога репозитория.
+        monkeypatch.syspath_prepend(str(settings.BASE_DIR))
+        call_command('dump_data', '--path', str(tmp_path), '--gzip',
+                     '--since', '2021-05-01', '--until', '2021-05-01',
+                     '--jobs', '2', stdout=StringIO())
+
+        with gzip.open(tmp_path / 'review.csv.gz', 'rt', encoding='utf-8',
+                       newline='') as file:
+            header, rows = read_csv(file)
+        assert header == list(reviews[0])
+        assert sorted(row[0] for row in rows) == sorted(recent), (
+            'Проверьте, что `--since` и `--until` ограничивают даты отзывов.'
+        )
+        assert rows[0][-1] == '2021-05-01T12:00:00.000Z'
+        with gzip.open(tmp_path / 'titles.csv.gz', 'rt', encoding='utf-8',
+                       newline='') as file:
+            assert len(read_csv(file)[1]) == len(
+                read_rows(data_dir, 'titles')
+            ), 'Проверьте, что диапазон дат не ограничивает другие таблицы.'
+
+    def test_03_invalid_range(self, tmp_path):
+        with pytest.raises(CommandError):
+            call_command('dump_data', '--path', str(tmp_path),
+                         '--since', '2021-02-01', '--until', '2021-01-01',
+                         stdout=StringIO())
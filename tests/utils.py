@@ -1,3 +1,4 @@
+import csv
 from http import HTTPStatus
 
 
@@ -305,3 +306,16 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def read_rows(path, name):
+    with open(path / f'{name}.csv', encoding='utf-8', newline='') as file:
+        return list(csv.DictReader(file))
+
+
+def write_rows(path, name, rows):
+    with open(path / f'{name}.csv', 'w', encoding='utf-8',
+              newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)